@@ -1,247 +1,108 @@
-import pygame
-from queue import PriorityQueue
-from collections import deque
-
-
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
-
-
-def h(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
-
-
-def dfs(draw, grid, start, end):
-    stack = [start]
-    came_from = {}
-    visited = set([start])
-
-    while stack:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = stack.pop()
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor not in visited:
-                stack.append(neighbor)
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def bfs(draw, grid, start, end):
-    queue = deque([start])
-    came_from = {}
-    visited = set([start])
-
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = queue.popleft()
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            if neighbor not in visited:
-                queue.append(neighbor)
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def bidirectional_search(draw, grid, start, end):
-    # Initialize two open sets (as deques) for the forward and backward searches
-    open_set_forward = deque([start])
-    open_set_backward = deque([end])
-
-    # Dictionaries to store where each node came from for both searches
-    came_from_forward = {}
-    came_from_backward = {}
-
-    visited_forward = {start}
-    visited_backward = {end}
-
-    while open_set_forward and open_set_backward:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        # Expand the forward search
-        current_forward = open_set_forward.popleft()
-        if current_forward in visited_backward:  # Intersection found
-            reconstruct_bidirectional_path(
-                came_from_forward, came_from_backward, current_forward, draw
-            )
-            return True
-        for neighbor in current_forward.neighbors:
-            if neighbor not in visited_forward:
-                came_from_forward[neighbor] = current_forward
-                open_set_forward.append(neighbor)
-                visited_forward.add(neighbor)
-                neighbor.make_open()
-        draw()
-
-        # Expand the backward search
-        current_backward = open_set_backward.popleft()
-        if current_backward in visited_forward:  # Intersection found
-            reconstruct_bidirectional_path(
-                came_from_forward, came_from_backward, current_backward, draw
-            )
-            return True
-        for neighbor in current_backward.neighbors:
-            if neighbor not in visited_backward:
-                came_from_backward[neighbor] = current_backward
-                open_set_backward.append(neighbor)
-                visited_backward.add(neighbor)
-                neighbor.make_open()
-        draw()
-
-        # Update colors
-        if current_forward != start:
-            current_forward.make_closed()
-        if current_backward != end:
-            current_backward.make_closed()
-
-    return False
-
-
-def reconstruct_bidirectional_path(
-    came_from_forward, came_from_backward, intersection, draw
+from Grid import OPEN, CLOSED, PATH
+from Hierarchy import Hierarchy
+from Movement import graph_for
+from Replanner import DStarLite
+from ResultCache import ResultCache
+from Search import SearchObserver
+from Strategies import search_for
+
+# UI glue for the headless search core in Search.py. Searches run on cell
+# indices as step generators driven by the Scheduler, and a PaintObserver
+# writes their progress into the grid's state buffer for the Renderer.
+
+# D* Lite planner kept between runs, so a re-run after painting barriers or
+# moving the start only repairs the part of the search those changes affect
+_planner = None
+
+# Movement views of the current grid, reused for the same reason
+_views = {}
+
+# HPA* clusters kept between runs; edits only drop the clusters they touch
+_hierarchy = None
+
+# Results of earlier runs on the current grid; a re-run of a query that no
+# edit since has affected just replays its path
+_cache = None
+
+
+def hierarchy_for(grid, create=True):
+    """
+    The HPA* Hierarchy kept for `grid`, made on first use. With create=False
+    returns None instead of making one.
+    """
+    global _hierarchy
+    if _hierarchy is None or not _hierarchy.matches(grid):
+        if not create:
+            return None
+        _hierarchy = Hierarchy(grid)
+    # Searches go through this run's view, so stats count them
+    _hierarchy.grid = grid
+    return _hierarchy
+
+
+def use_hierarchy(hierarchy):
+    # Adopts clusters worked out elsewhere (a loaded map file)
+    global _hierarchy
+    _hierarchy = hierarchy
+
+
+class PaintObserver(SearchObserver):
+    # Colours cells as the search goes, logging each change to `recording`
+    # (a Recording.Recording) when there is one
+    def __init__(self, grid, start, end, recording=None):
+        self.grid = grid
+        self.start = start
+        self.end = end
+        self.recording = recording
+
+    def paint(self, index, state):
+        if index != self.start and index != self.end:
+            self.grid.set_state(index, state)
+            if self.recording is not None:
+                self.recording.add(index, state)
+
+    def opened(self, index):
+        self.paint(index, OPEN)
+
+    def closed(self, index):
+        self.paint(index, CLOSED)
+
+    def path(self, index):
+        self.paint(index, PATH)
+
+
+def search_steps(
+    label, grid, start, end, stats=None, movement="4-way", recording=None
 ):
-    # Color the intersection node first
-    intersection.make_path()
-    draw()
-
-    # Reconstruct the path from the start to the intersection
-    current = intersection
-    while current in came_from_forward:
-        current = came_from_forward[current]
-        current.make_path()
-        draw()
-
-    # Reconstruct the path from the end to the intersection
-    current = intersection
-    while current in came_from_backward:
-        current = came_from_backward[current]
-        current.make_path()
-        draw()
-
-
-def dijkstra(draw, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-    came_from = {}
-    g_score = {node: float("inf") for row in grid for node in row}
-    g_score[start] = 0
-
-    open_set_hash = {start}
-
-    while not open_set.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
-
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((g_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def aStar(draw, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-    came_from = {}
-    g_score = {node: float("inf") for row in grid for node in row}
-    g_score[start] = 0
-    f_score = {node: float("inf") for row in grid for node in row}
-    f_score[start] = h(start.get_pos(), end.get_pos())
-
-    open_set_hash = {start}
-
-    while not open_set.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
-
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    neighbor.make_open()
-
-        draw()
-
-        if current != start:
-            current.make_closed()
-
-    return False
+    """
+    Step generator for the dropdown entry `label`, painting into `grid`.
+
+    :param start: Start cell index.
+    :param end: End cell index.
+    :param stats: Optional Instrumentation.Stats counting the search's work.
+    :param movement: Movement model from Movement.MOVEMENTS.
+    :param recording: Optional Recording.Recording of `grid` logging the run.
+    """
+    global _planner, _cache
+    if _cache is None or not _cache.matches(grid):
+        _cache = ResultCache(grid)
+    observer = PaintObserver(grid, start, end, recording)
+    if movement != "4-way":
+        view = _views.get(movement)
+        if view is None or view.grid is not grid:
+            view = _views[movement] = graph_for(grid, movement)
+        grid = view
+    if stats is not None:
+        grid, observer = stats.instrument(grid, observer)
+    search = search_for(label, movement)
+    if label == "D* Lite" and movement != "Any-angle":
+        if _planner is None or not _planner.matches(grid, end):
+            _planner = DStarLite(grid, start, end)
+        _planner.move_start(start)
+        steps = _planner.plan_steps(observer)
+    elif label == "HPA*" and movement == "4-way":
+        steps = hierarchy_for(grid).search_steps(start, end, observer)
+    else:
+        steps = search.steps(grid, start, end, observer)
+    steps = _cache.steps(grid, search, start, end, steps, observer)
+    return steps if recording is None else recording.record(steps)
@@ -0,0 +1,89 @@
+from multiprocessing import Pool
+
+from MapFile import load
+from Movement import graph_for
+from ResultCache import ResultCache
+from SharedGrid import attach, share
+from Strategies import search_for
+
+# Batch queries: many (start, end) pairs against one obstacle layout, fanned
+# out over a process pool. The grid reaches the workers through shared memory
+# (SharedGrid.py), so no task ever pickles it. A grid saved with MapFile.save
+# can be passed by path instead: every worker maps the file read-only, sharing
+# its pages with the others, and nothing is copied at all.
+
+_worker_grid = None
+_worker_memory = None
+_worker_cache = None
+
+
+def _attach(spec, movement, cache):
+    global _worker_memory
+    _worker_memory, grid = attach(spec)
+    _use(grid, movement, cache)
+
+
+def _open(path, movement, cache):
+    _use(load(path, writable=False).grid, movement, cache)
+
+
+def _use(grid, movement, cache):
+    global _worker_grid, _worker_cache
+    _worker_grid = graph_for(grid, movement)
+    if cache:
+        _worker_cache = ResultCache(grid, cache)
+
+
+def _search(task):
+    algorithm, start, end = task
+    if _worker_cache is not None:
+        return start, end, _worker_cache.search(_worker_grid, algorithm, start, end)
+    return start, end, algorithm(_worker_grid, start, end)
+
+
+def run_batch(
+    grid,
+    queries,
+    algorithm="A* Search",
+    processes=None,
+    chunksize=64,
+    movement="4-way",
+    cache=0,
+):
+    """
+    Runs every (start, end) query against `grid` in a process pool.
+
+    :param grid: The Grid to search, or the path of a map file holding it.
+        Later edits to a Grid are not seen by the batch.
+    :param queries: Iterable of (start, end) cell indices.
+    :param algorithm: A dropdown label from Strategies.ALGORITHMS or a search
+        function from Search.py.
+    :param processes: Worker count, defaults to the number of CPUs.
+    :param chunksize: Queries handed to a worker at a time.
+    :param movement: Movement model from Movement.MOVEMENTS.
+    :param cache: Results each worker keeps (see ResultCache), for batches
+        that repeat queries; 0 turns caching off.
+    :return: Iterator of (start, end, SearchResult) in query order.
+    """
+    if isinstance(algorithm, str):
+        algorithm = search_for(algorithm, movement)
+    tasks = ((algorithm, start, end) for start, end in queries)
+
+    if isinstance(grid, str):
+        with Pool(
+            processes, initializer=_open, initargs=(grid, movement, cache)
+        ) as pool:
+            for item in pool.imap(_search, tasks, chunksize):
+                yield item
+        return
+
+    memory, spec = share(grid)
+    try:
+        with Pool(
+            processes, initializer=_attach, initargs=(spec, movement, cache)
+        ) as pool:
+            for item in pool.imap(_search, tasks, chunksize):
+                yield item
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,609 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from itertools import islice
+
+import Maze
+import Search
+from Grid import Grid, BARRIER, EMPTY, generate_random_maze
+from Hierarchy import Hierarchy
+from Movement import OctileGrid
+from Replanner import DStarLite
+from Strategies import ALGORITHMS
+
+# Headless benchmarks for the search core. Run `python Benchmark.py --help`.
+
+
+def random_maze(size, density, seed):
+    random.seed(seed)
+    grid = Grid(size)
+    generate_random_maze(grid, density)
+    # Keep opposite corners open so the query is usually solvable
+    grid.set_state(0, EMPTY)
+    grid.set_state(grid.size - 1, EMPTY)
+    return grid
+
+
+# Suite workloads: each returns (grid, start, end) for a size x size map
+
+
+def empty_workload(size, seed):
+    return Grid(size), 0, size * size - 1
+
+
+def random_workload(size, seed, density):
+    return random_maze(size, density, seed), 0, size * size - 1
+
+
+def corridor_workload(size, seed):
+    # Every other row is a wall with one gap, alternating between the two
+    # ends, so the only route snakes through every corridor. The seed moves
+    # each gap a little away from the end.
+    rng = random.Random(seed)
+    grid = Grid(size)
+    state = grid.state
+    for row in range(1, size - 1, 2):
+        state[row * size : (row + 1) * size] = bytes([BARRIER]) * size
+        offset = rng.randrange(max(size // 10, 1))
+        gap = size - 1 - offset if row % 4 == 1 else offset
+        state[row * size + gap] = EMPTY
+    grid.mark_all_changed()
+    return grid, 0, grid.size - 1
+
+
+def spiral_workload(size, seed):
+    # Nested square walls, each with one gap on the side opposite the gap of
+    # the wall around it, so the route winds all the way to the centre
+    grid = Grid(size)
+    state = grid.state
+    wall = bytes([BARRIER])
+    ring = 0
+    for offset in range(1, size // 2, 2):
+        low, high = offset, size - 1 - offset
+        if high - low < 2:
+            break
+        length = high - low + 1
+        state[low * size + low : low * size + high + 1] = wall * length
+        state[high * size + low : high * size + high + 1] = wall * length
+        state[low * size + low : high * size + low + 1 : size] = wall * length
+        state[low * size + high : high * size + high + 1 : size] = wall * length
+        middle = (low + high) // 2
+        if ring % 2:
+            state[high * size + middle] = EMPTY
+        else:
+            state[low * size + middle] = EMPTY
+        ring += 1
+    centre = (size // 2) * size + size // 2
+    state[centre] = EMPTY
+    grid.mark_all_changed()
+    return grid, 0, centre
+
+
+def maze_workload(kind, size, seed):
+    # A Maze generator's map, from the first open cell to the reachable cell
+    # farthest from it, so every query has a long answer
+    from DistanceField import distance_field
+
+    grid = Grid(size)
+    Maze.generate(grid, kind, seed)
+    start = bytes(grid.state).find(EMPTY)
+    end = int(distance_field(grid, start).argmax())
+    return grid, start, end
+
+
+def kruskal_workload(size, seed):
+    return maze_workload("Kruskal", size, seed)
+
+
+def division_workload(size, seed):
+    return maze_workload("Division", size, seed)
+
+
+def caves_workload(size, seed):
+    return maze_workload("Caves", size, seed)
+
+
+WORKLOADS = {
+    "empty": empty_workload,
+    "random": random_workload,
+    "corridor": corridor_workload,
+    "spiral": spiral_workload,
+    "kruskal": kruskal_workload,
+    "division": division_workload,
+    "caves": caves_workload,
+}
+
+# Workloads whose map depends on the seed
+SEEDED = ["random", "corridor", "kruskal", "division", "caves"]
+
+
+def time_search(search, grid, start, end):
+    began = time.perf_counter()
+    result = search(grid, start, end)
+    return result, time.perf_counter() - began
+
+
+def compare_jps(sizes, densities, seeds):
+    print(
+        "{:>6} {:>7} {:>5} | {:>9} {:>9} | {:>9} {:>9} | {:>7}".format(
+            "size", "density", "seed", "A* exp", "A* ms", "JPS exp", "JPS ms", "same"
+        )
+    )
+    for size in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                grid = random_maze(size, density, seed)
+                start, end = 0, grid.size - 1
+                astar, astar_time = time_search(Search.aStar, grid, start, end)
+                jps, jps_time = time_search(Search.jump_point_search, grid, start, end)
+                print(
+                    "{:>6} {:>7} {:>5} | {:>9} {:>9.1f} | {:>9} {:>9.1f} | {:>7}".format(
+                        size,
+                        density,
+                        seed,
+                        astar.expanded,
+                        astar_time * 1000,
+                        jps.expanded,
+                        jps_time * 1000,
+                        "yes" if astar.cost == jps.cost else "NO",
+                    )
+                )
+
+
+def compare_bidirectional(sizes, densities, seeds):
+    # aStar against bidirectional_astar (NBA*) between opposite corners
+    print(
+        "{:>6} {:>7} {:>5} | {:>9} {:>9} | {:>9} {:>9} | {:>7}".format(
+            "size", "density", "seed", "A* exp", "A* ms", "BA* exp", "BA* ms", "same"
+        )
+    )
+    for size in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                grid = random_maze(size, density, seed)
+                start, end = 0, grid.size - 1
+                astar, astar_time = time_search(Search.aStar, grid, start, end)
+                both, both_time = time_search(
+                    Search.bidirectional_astar, grid, start, end
+                )
+                print(
+                    "{:>6} {:>7} {:>5} | {:>9} {:>9.1f} | {:>9} {:>9.1f} | {:>7}".format(
+                        size,
+                        density,
+                        seed,
+                        astar.expanded,
+                        astar_time * 1000,
+                        both.expanded,
+                        both_time * 1000,
+                        "yes" if astar.cost == both.cost else "NO",
+                    )
+                )
+
+
+def compare_movement(sizes, densities, seeds):
+    # 4-way aStar against aStar over diagonal moves and any-angle Theta*, on
+    # the same maps; lengths are geometric (unit cells, diagonal sqrt(2))
+    print(
+        "{:>6} {:>7} {:>5} | {:>8} {:>8} {:>7} | {:>8} {:>8} {:>7} | {:>8} {:>8} {:>7}".format(
+            "size", "density", "seed",
+            "4 exp", "4 len", "4 ms",
+            "8 exp", "8 len", "8 ms",
+            "any exp", "any len", "any ms",
+        )
+    )  # fmt: skip
+    for size in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                grid = random_maze(size, density, seed)
+                start, end = 0, grid.size - 1
+                columns = []
+                for search, graph in (
+                    (Search.aStar, grid),
+                    (Search.aStar, OctileGrid(grid)),
+                    (Search.theta_star, grid),
+                ):
+                    result, seconds = time_search(search, graph, start, end)
+                    if not result.found:
+                        break
+                    columns += [result.expanded, result.cost, seconds * 1000]
+                else:
+                    print(
+                        "{:>6} {:>7} {:>5} | {:>8} {:>8.1f} {:>7.1f} | {:>8} {:>8.1f} "
+                        "{:>7.1f} | {:>8} {:>8.1f} {:>7.1f}".format(
+                            size, density, seed, *columns
+                        )
+                    )
+
+
+def compare_replanning(sizes, densities, seeds, rounds, changes):
+    # Each round flips `changes` cells on or next to the current path, then
+    # times a D* Lite repair against a fresh aStar on the edited grid
+    print(
+        "{:>6} {:>7} {:>5} | {:>9} {:>9} | {:>9} {:>9} | {:>7}".format(
+            "size", "density", "seed", "A* exp", "A* ms", "D* exp", "D* ms", "same"
+        )
+    )
+    for size in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                grid = random_maze(size, density, seed)
+                start, end = 0, grid.size - 1
+                planner = DStarLite(grid, start, end)
+                path = planner.plan().path
+                totals = [0, 0.0, 0, 0.0]
+                same = True
+                for _ in range(rounds):
+                    if not path:
+                        break
+                    for cell in random.sample(path[1:-1], min(changes, len(path) - 2)):
+                        grid.set_state(cell, BARRIER)
+                    astar, astar_time = time_search(Search.aStar, grid, start, end)
+                    began = time.perf_counter()
+                    replanned = planner.plan()
+                    replan_time = time.perf_counter() - began
+                    same = same and replanned.cost == astar.cost
+                    totals[0] += astar.expanded
+                    totals[1] += astar_time
+                    totals[2] += replanned.expanded
+                    totals[3] += replan_time
+                    path = replanned.path
+                print(
+                    "{:>6} {:>7} {:>5} | {:>9} {:>9.1f} | {:>9} {:>9.1f} | {:>7}".format(
+                        size,
+                        density,
+                        seed,
+                        totals[0] // rounds,
+                        totals[1] * 1000 / rounds,
+                        totals[2] // rounds,
+                        totals[3] * 1000 / rounds,
+                        "yes" if same else "NO",
+                    )
+                )
+
+
+def compare_hierarchy(sizes, densities, seeds, rounds):
+    # `rounds` random queries per map: aStar against HPA* with its clusters
+    # cold (first query, building what it reaches) and warm (later queries);
+    # "ratio" is the mean HPA* path cost over the optimal one
+    print(
+        "{:>6} {:>7} {:>5} | {:>9} {:>9} | {:>9} {:>9} {:>9} | {:>7}".format(
+            "size", "density", "seed",
+            "A* exp", "A* ms", "HPA exp", "cold ms", "warm ms", "ratio",
+        )
+    )  # fmt: skip
+    for size in sizes:
+        for density in densities:
+            for seed in range(seeds):
+                grid = random_maze(size, density, seed)
+                hierarchy = Hierarchy(grid)
+                rng = random.Random(seed)
+                free = [i for i in range(grid.size) if not grid.is_barrier(i)]
+                totals = [0, 0.0, 0, 0.0, 0.0]
+                cold = None
+                found = 0
+                for _ in range(rounds):
+                    start, end = rng.sample(free, 2)
+                    astar, astar_time = time_search(Search.aStar, grid, start, end)
+                    began = time.perf_counter()
+                    hpa = deque(hierarchy.search_steps(start, end), maxlen=1)[0]
+                    hpa_time = time.perf_counter() - began
+                    if cold is None:
+                        cold = hpa_time
+                    else:
+                        totals[3] += hpa_time
+                    totals[0] += astar.expanded
+                    totals[1] += astar_time
+                    totals[2] += hpa.expanded
+                    if astar.found and astar.cost:
+                        found += 1
+                        totals[4] += hpa.cost / astar.cost
+                print(
+                    "{:>6} {:>7} {:>5} | {:>9} {:>9.1f} | {:>9} {:>9.1f} {:>9.1f} "
+                    "| {:>7.3f}".format(
+                        size,
+                        density,
+                        seed,
+                        totals[0] // rounds,
+                        totals[1] * 1000 / rounds,
+                        totals[2] // rounds,
+                        cold * 1000,
+                        totals[3] * 1000 / max(rounds - 1, 1),
+                        totals[4] / max(found, 1),
+                    )
+                )
+
+
+def run_budgeted(search, grid, start, end, budget):
+    # Drives the step generator in chunks so a run can be abandoned once it
+    # exceeds `budget` seconds; returns (result or None, seconds)
+    steps = search.steps(grid, start, end)
+    began = time.perf_counter()
+    while True:
+        last = deque(islice(steps, 4096), maxlen=1)
+        elapsed = time.perf_counter() - began
+        if last and last[0] is not None:
+            return last[0], elapsed
+        if not last:
+            return None, elapsed  # Exhausted without a result
+        if elapsed > budget:
+            steps.close()
+            return None, elapsed
+
+
+def measure(search, grid, start, end, budget, repeat, memory):
+    """
+    Runs one search and returns its record fields.
+
+    :param budget: Seconds after which a run is abandoned (status "timeout").
+    :param repeat: Timed runs; the fastest one is reported.
+    :param memory: Also measure peak traced memory, in a separate run since
+        tracing slows the search down several times.
+    """
+    result, seconds = run_budgeted(search, grid, start, end, budget)
+    if result is None:
+        return {"status": "timeout", "seconds": seconds}
+    for _ in range(repeat - 1):
+        seconds = min(seconds, run_budgeted(search, grid, start, end, budget)[1])
+    record = {
+        "status": "ok",
+        "seconds": seconds,
+        "expanded": result.expanded,
+        "expansions_per_sec": result.expanded / seconds if seconds else None,
+        "found": result.found,
+        "cost": result.cost,
+        "peak_bytes": None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            run_budgeted(search, grid, start, end, budget * 4)
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return record
+
+
+def run_suite(workloads, sizes, densities, seeds, algorithms, budget, repeat, memory):
+    """
+    Benchmarks every algorithm on every workload and returns a list of
+    records, one per (workload, size, density, seed, algorithm).
+    """
+    from DistanceField import distance_field
+
+    records = []
+    print(
+        "{:>8} {:>6} {:>7} {:>4} {:>20} | {:>9} {:>10} {:>10} {:>8} {:>7}".format(
+            "workload", "size", "density", "seed", "algorithm",
+            "ms", "exp/s", "expanded", "peak MB", "optimal",
+        )
+    )  # fmt: skip
+    for workload in workloads:
+        for size in sizes:
+            for density in densities if workload == "random" else [None]:
+                for seed in range(seeds if workload in SEEDED else 1):
+                    if density is None:
+                        grid, start, end = WORKLOADS[workload](size, seed)
+                    else:
+                        grid, start, end = WORKLOADS[workload](size, seed, density)
+                    # The optimal cost, from a vectorized BFS over the same map
+                    optimal = int(distance_field(grid, start).flat[end])
+                    optimal = None if optimal < 0 else optimal
+                    for label in algorithms:
+                        record = {
+                            "workload": workload,
+                            "size": size,
+                            "density": density,
+                            "seed": seed,
+                            "algorithm": label,
+                            "optimal_cost": optimal,
+                        }
+                        record.update(
+                            measure(
+                                ALGORITHMS[label],
+                                grid,
+                                start,
+                                end,
+                                budget,
+                                repeat,
+                                memory,
+                            )
+                        )
+                        if record["status"] == "ok":
+                            record["optimal"] = record["cost"] == optimal
+                        records.append(record)
+                        print_record(record)
+    return records
+
+
+def print_record(record):
+    if record["status"] != "ok":
+        print(
+            "{:>8} {:>6} {:>7} {:>4} {:>20} | timed out after {:.1f}s".format(
+                record["workload"],
+                record["size"],
+                "-" if record["density"] is None else record["density"],
+                record["seed"],
+                record["algorithm"],
+                record["seconds"],
+            )
+        )
+        return
+    peak = record["peak_bytes"]
+    print(
+        "{:>8} {:>6} {:>7} {:>4} {:>20} | {:>9.1f} {:>10.0f} {:>10} {:>8} {:>7}".format(
+            record["workload"],
+            record["size"],
+            "-" if record["density"] is None else record["density"],
+            record["seed"],
+            record["algorithm"],
+            record["seconds"] * 1000,
+            record["expansions_per_sec"] or 0,
+            record["expanded"],
+            "-" if peak is None else "{:.1f}".format(peak / 2**20),
+            "yes" if record["optimal"] else "NO",
+        )
+    )
+
+
+def record_key(record):
+    return (
+        record["workload"],
+        record["size"],
+        record["density"],
+        record["seed"],
+        record["algorithm"],
+    )
+
+
+def compare_to_baseline(records, baseline, tolerance, min_seconds=0.005):
+    """
+    Lists regressions of `records` against the records of a baseline run: a
+    run that got slower by more than `tolerance` (and by at least
+    `min_seconds`, to ignore timer noise on tiny maps), used more memory by
+    the same margin, expanded a different number of cells, lost optimality
+    or started timing out.
+    """
+    previous = {record_key(record): record for record in baseline}
+    regressions = []
+    for record in records:
+        old = previous.get(record_key(record))
+        if old is None:
+            continue
+        name = "{} {} {} seed {} {}".format(*record_key(record))
+        if record["status"] != "ok":
+            if old["status"] == "ok":
+                regressions.append(name + ": now times out")
+            continue
+        if old["status"] != "ok":
+            continue
+        if (
+            record["seconds"] > old["seconds"] * (1 + tolerance)
+            and record["seconds"] - old["seconds"] >= min_seconds
+        ):
+            regressions.append(
+                "{}: {:.1f}ms -> {:.1f}ms".format(
+                    name, old["seconds"] * 1000, record["seconds"] * 1000
+                )
+            )
+        if (
+            record["peak_bytes"] is not None
+            and old["peak_bytes"] is not None
+            and record["peak_bytes"] > old["peak_bytes"] * (1 + tolerance)
+        ):
+            regressions.append(
+                "{}: peak memory {:.1f}MB -> {:.1f}MB".format(
+                    name, old["peak_bytes"] / 2**20, record["peak_bytes"] / 2**20
+                )
+            )
+        if record["expanded"] != old["expanded"]:
+            regressions.append(
+                "{}: expanded {} -> {}".format(
+                    name, old["expanded"], record["expanded"]
+                )
+            )
+        if old["optimal"] and not record["optimal"]:
+            regressions.append(name + ": path is no longer optimal")
+    return regressions
+
+
+def suite(args):
+    records = run_suite(
+        args.workloads,
+        args.sizes,
+        args.densities or [0.1, 0.2, 0.3],
+        args.seeds,
+        args.algorithms,
+        args.budget,
+        args.repeat,
+        not args.no_memory,
+    )
+    if args.output:
+        report = {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "records": records,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["records"]
+        regressions = compare_to_baseline(records, baseline, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against " + args.baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless search benchmarks")
+    parser.add_argument(
+        "benchmark", choices=["jps", "bidir", "replan", "movement", "hpa", "suite"]
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument(
+        "--densities",
+        type=float,
+        nargs="+",
+        help="barrier densities (default 0 0.1 0.2 0.3, suite 0.1 0.2 0.3)",
+    )
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="replan rounds, HPA* queries"
+    )
+    parser.add_argument("--changes", type=int, default=3, help="cells per round")
+    parser.add_argument(
+        "--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS)
+    )
+    parser.add_argument(
+        "--algorithms",
+        nargs="+",
+        choices=list(ALGORITHMS),
+        default=["DFS", "BFS", "Bidirectional Search", "Dijkstra", "A* Search"],
+    )
+    parser.add_argument(
+        "--budget", type=float, default=30.0, help="seconds before a run is dropped"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the peak memory run"
+    )
+    parser.add_argument("--output", help="write the suite results as JSON")
+    parser.add_argument("--baseline", help="suite JSON to check for regressions")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%"
+    )
+    args = parser.parse_args()
+    if args.benchmark == "suite":
+        suite(args)
+    elif args.benchmark == "jps":
+        compare_jps(args.sizes, args.densities or [0.0, 0.1, 0.2, 0.3], args.seeds)
+    elif args.benchmark == "bidir":
+        compare_bidirectional(
+            args.sizes, args.densities or [0.0, 0.1, 0.2, 0.3], args.seeds
+        )
+    elif args.benchmark == "movement":
+        compare_movement(args.sizes, args.densities or [0.0, 0.1, 0.2, 0.3], args.seeds)
+    elif args.benchmark == "hpa":
+        compare_hierarchy(
+            args.sizes, args.densities or [0.0, 0.1, 0.2, 0.3], args.seeds, args.rounds
+        )
+    else:
+        compare_replanning(
+            args.sizes,
+            args.densities or [0.0, 0.1, 0.2, 0.3],
+            args.seeds,
+            args.rounds,
+            args.changes,
+        )
+
+
+if __name__ == "__main__":
+    main()
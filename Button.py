@@ -1,5 +1,7 @@
 import pygame.font
 
+from Fonts import render_text
+
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
@@ -33,6 +35,7 @@ class Button:
         self.pressed = False
         self.clicked = False
         self.state_changed = False
+        self.surfaces = {}  # Cached looks, see draw()
         self.hover_color = (
             hover_color
             if hover_color
@@ -76,34 +79,51 @@ class Button:
         self.hover_color = color
 
     def draw(self, win, outline=None):
-        # Draw the button with an optional outline
+        # Draw the button with an optional outline. Each look (normal, hover,
+        # pressed, per label) is rendered once and then only blitted.
+        key = (self.color, self.width, self.height, self.text, outline)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = self.render(outline)
+        pad = 2 if outline else 0
+        win.blit(surface, (self.x - pad, self.y - pad))
+
+    def render(self, outline=None):
+        pad = 2 if outline else 0
+        surface = pygame.Surface(
+            (self.width + 2 * pad, self.height + 2 * pad), pygame.SRCALPHA
+        )
         if outline:
             pygame.draw.rect(
-                win,
+                surface,
                 outline,
-                (self.x - 2, self.y - 2, self.width + 4, self.height + 4),
+                (0, 0, self.width + 4, self.height + 4),
                 0,
                 border_radius=self.border_radius + 2,
             )
         pygame.draw.rect(
-            win,
+            surface,
             self.color,
-            (self.x, self.y, self.width, self.height),
+            (pad, pad, self.width, self.height),
             0,
             border_radius=self.border_radius,
         )
 
         # Draw the text on the button
         if self.text != "":
-            font = pygame.font.SysFont("calibri", 16)
-            text = font.render(self.text, 1, (0, 0, 0))
-            win.blit(
+            text = render_text(self.text, 16)
+            # Positioned as if blitted straight onto the window at (x, y),
+            # which lands on a half pixel while pressed
+            left = int(self.x - pad)
+            top = int(self.y - pad)
+            surface.blit(
                 text,
                 (
-                    self.x + (self.width / 2 - text.get_width() / 2),
-                    self.y + (self.height / 2 - text.get_height() / 2),
+                    int(self.x + (self.width / 2 - text.get_width() / 2)) - left,
+                    int(self.y + (self.height / 2 - text.get_height() / 2)) - top,
                 ),
             )
+        return surface
 
     def is_over(self, pos):
         # Check if the mouse position is over the button
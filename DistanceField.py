@@ -0,0 +1,88 @@
+import numpy as np
+
+from Grid import BARRIER
+
+# Single-source distance maps over a Grid, computed as a breadth-first
+# wavefront in NumPy: each step expands the whole frontier at once using flat
+# index offsets on a barrier-padded copy of the map, so the Python loop runs
+# once per distance ring instead of once per cell.
+
+UNREACHABLE = -1
+
+
+def distance_field(grid, source):
+    """
+    Steps from `source` to every cell of `grid` (4-connected, unit cost).
+
+    :param grid: The Grid to measure.
+    :param source: Cell index to measure from.
+    :return: int32 array of shape (rows, cols); barriers and cells that cannot
+        be reached hold UNREACHABLE.
+    """
+    rows, cols = grid.rows, grid.cols
+    width = cols + 2
+    state = np.frombuffer(grid.state, dtype=np.uint8, count=grid.size)
+
+    # One ring of barrier around the map removes all bounds checks
+    passable = np.zeros((rows + 2, width), dtype=bool)
+    passable[1:-1, 1:-1] = state.reshape(rows, cols) != BARRIER
+    passable = passable.ravel()
+    distance = np.full(passable.size, UNREACHABLE, dtype=np.int32)
+    claimed = np.zeros(passable.size, dtype=np.int64)
+
+    source_row, source_col = divmod(source, cols)
+    frontier = np.array([(source_row + 1) * width + source_col + 1])
+    if not passable[frontier[0]]:
+        return distance.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+    passable[frontier] = False
+    distance[frontier] = 0
+
+    offsets = np.array([width, -width, 1, -1])
+    step = 0
+    while frontier.size:
+        step += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[passable[candidates]]
+        # Several frontier cells can reach the same cell; keep one copy of each
+        # by letting the last write win and selecting the winners
+        order = np.arange(candidates.size)
+        claimed[candidates] = order
+        frontier = candidates[claimed[candidates] == order]
+        passable[frontier] = False
+        distance[frontier] = step
+
+    return distance.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+
+
+def path_from_field(grid, field, target):
+    """
+    Walks down a distance field from `target` back to its source.
+
+    :return: List of cell indices from the source to `target`, or an empty list
+        if `target` is unreachable.
+    """
+    cols = grid.cols
+    row, col = divmod(target, cols)
+    remaining = int(field[row, col])
+    if remaining == UNREACHABLE:
+        return []
+
+    path = [target]
+    while remaining:
+        remaining -= 1
+        for next_row, next_col in (
+            (row + 1, col),
+            (row - 1, col),
+            (row, col + 1),
+            (row, col - 1),
+        ):
+            if (
+                0 <= next_row < grid.rows
+                and 0 <= next_col < cols
+                and field[next_row, next_col] == remaining
+            ):
+                row, col = next_row, next_col
+                break
+        path.append(row * cols + col)
+    path.reverse()
+    return path
@@ -1,5 +1,7 @@
 import pygame
 
+from Fonts import render_text
+
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
@@ -27,7 +29,7 @@ class Dropdown:
         self.options = options
         self.selected_option = options[default_index]
         self.is_open = False
-        self.font = pygame.font.SysFont("calibri", 18)
+        self.surfaces = {}  # Cached header and option rows, see draw()
         self.border_radius = 10  # Radius for rounded corners
         self.default_color = LIGHT_VIOLET
         self.hover_color = LILAC
@@ -57,29 +59,13 @@ class Dropdown:
             self.pressed = False
 
     def draw(self, win):
-        pygame.draw.rect(
-            win,
-            self.color,
-            (self.x, self.y, self.width, self.height),
-            0,
-            border_radius=self.border_radius,
-        )
-        pygame.draw.rect(
-            win,
-            BLACK,
-            (self.x, self.y, self.width, self.height),
-            2,
-            border_radius=self.border_radius,
-        )
-        text = self.font.render(self.selected_option, 1, BLACK)
-        text_width, text_height = text.get_size()
-        win.blit(
-            text,
-            (
-                self.x + (self.width - text_width) // 2,
-                self.y + (self.height - text_height) // 2,
-            ),
-        )
+        key = (self.color, self.width, self.height, self.selected_option)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = self.render_box(
+                self.color, self.selected_option
+            )
+        win.blit(surface, (self.x, self.y))
 
         if self.is_open:
             for i, option in enumerate(self.options):
@@ -88,31 +74,25 @@ class Dropdown:
                     i == self.hovered_option
                 ):  # Check if this option is being hovered over
                     color = self.hover_color
-                pygame.draw.rect(
-                    win,
-                    color,
-                    (self.x, self.y + (i + 1) * self.height, self.width, self.height),
-                    0,
-                    border_radius=self.border_radius,
-                )
-                pygame.draw.rect(
-                    win,
-                    BLACK,
-                    (self.x, self.y + (i + 1) * self.height, self.width, self.height),
-                    2,
-                    border_radius=self.border_radius,
-                )
-                text = self.font.render(option, 1, BLACK)
-                text_width, text_height = text.get_size()
-                win.blit(
-                    text,
-                    (
-                        self.x + (self.width - text_width) // 2,
-                        self.y
-                        + (i + 1) * self.height
-                        + (self.height - text_height) // 2,
-                    ),
-                )
+                key = (color, self.width, self.height, option)
+                surface = self.surfaces.get(key)
+                if surface is None:
+                    surface = self.surfaces[key] = self.render_box(color, option)
+                win.blit(surface, (self.x, self.y + (i + 1) * self.height))
+
+    def render_box(self, color, label):
+        # One rounded, outlined box with a centered label
+        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        rect = (0, 0, self.width, self.height)
+        pygame.draw.rect(surface, color, rect, 0, border_radius=self.border_radius)
+        pygame.draw.rect(surface, BLACK, rect, 2, border_radius=self.border_radius)
+        text = render_text(label, 18)
+        text_width, text_height = text.get_size()
+        surface.blit(
+            text,
+            ((self.width - text_width) // 2, (self.height - text_height) // 2),
+        )
+        return surface
 
     def handle_event(self, event):
         pos = pygame.mouse.get_pos()
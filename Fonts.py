@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+import pygame.font
+
+# Process-wide font and text cache. SysFont scans the system font list on every
+# call and font.render rasterizes the whole string, so widgets go through here
+# instead of loading fonts or rendering labels themselves.
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size):
+    return pygame.font.SysFont(name, size)
+
+
+@lru_cache(maxsize=512)
+def render_text(text, size, color=(0, 0, 0), name="calibri"):
+    """
+    Rendered (antialiased) text surface, shared by every caller asking for the
+    same string. Callers must not draw onto the returned surface.
+    """
+    return get_font(name, size).render(text, 1, color)
@@ -0,0 +1,220 @@
+import random
+
+import numpy as np
+
+# Cell states, one byte per cell in Grid.state
+EMPTY = 0
+BARRIER = 1
+START = 2
+END = 3
+OPEN = 4
+CLOSED = 5
+PATH = 6
+
+MAX_EDITS = 1 << 16
+
+# Largest step cost for which searches use Dial's bucket queue; above it the
+# buckets get too sparse and the binary heap wins
+SMALL_COST = 16
+
+# Neighbor bits in Grid.adjacency, in the order neighbors() lists them
+DOWN = 1
+UP = 2
+RIGHT = 4
+LEFT = 8
+
+# Maps search colouring (OPEN, CLOSED, PATH) to EMPTY and keeps other states,
+# for bytes.translate
+CLEAR_SEARCH = bytes(EMPTY if value >= OPEN else value for value in range(256))
+
+
+class Grid:
+    """
+    Compact grid model: one byte of state per cell in a flat bytearray, cells
+    addressed by integer index (row * cols + col). Neighbors are computed from
+    index arithmetic, so no per-cell objects exist.
+
+    Implements the graph interface expected by Search.py. Pass `state` to wrap
+    an existing buffer (e.g. shared memory) instead of allocating one.
+
+    Terrain weights live in `costs`, one byte per cell holding the cost (1-255)
+    of stepping onto it. It stays None, meaning unit costs everywhere, until the
+    first weight is set.
+    """
+
+    def __init__(self, rows, cols=None, state=None):
+        self.rows = rows
+        self.cols = cols if cols else rows
+        self.size = self.rows * self.cols
+        self.state = state if state is not None else bytearray(self.size)
+        self.connectivity = 4  # See Movement.py for 8-way and any-angle
+        self.integer_costs = True  # Small integer steps and Manhattan distance
+        self.costs = None
+        self.max_cost = 1
+
+        # Per-cell bitmask of passable neighbors, built on first use and then
+        # kept in step with barrier edits; steps[mask] lists the index offsets
+        cols = self.cols
+        self.adjacency = None
+        self.steps = [
+            tuple(
+                step
+                for bit, step in ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+                if mask & bit
+            )
+            for mask in range(16)
+        ]
+
+        # Barrier and cost edit log for incremental consumers (replanning,
+        # caches): remember `version`, later ask edits_since(version) for what
+        # changed
+        self.version = 0
+        self.edits = []
+        self.edits_base = 0
+
+        # Cells changed since the renderer last looked; None when nothing draws.
+        # `repaints` counts bulk rewrites, after which it redraws everything.
+        self.dirty = None
+        self.repaints = 0
+
+    def set_state(self, index, state):
+        old = self.state[index]
+        self.state[index] = state
+        if self.dirty is not None:
+            self.dirty.add(index)
+        if (old == BARRIER) != (state == BARRIER):
+            if self.adjacency is not None:
+                self.update_adjacency(index, state != BARRIER)
+            self.log_edit(index)
+
+    def cost(self, index):
+        return 1 if self.costs is None else self.costs[index]
+
+    def set_cost(self, index, cost):
+        """
+        Sets the cost of stepping onto a cell.
+
+        :param cost: Integer from 1 (plain floor) to 255.
+        """
+        if not 1 <= cost <= 255:
+            raise ValueError("cell costs must be between 1 and 255")
+        if self.costs is None:
+            if cost == 1:
+                return
+            self.costs = bytearray(b"\x01") * self.size
+        if self.costs[index] == cost:
+            return
+        self.costs[index] = cost
+        if cost > self.max_cost:
+            self.max_cost = cost
+            self.integer_costs = cost <= SMALL_COST
+        if self.dirty is not None:
+            self.dirty.add(index)
+        self.log_edit(index)
+
+    def log_edit(self, index):
+        if len(self.edits) >= MAX_EDITS:
+            self.mark_all_changed()
+        self.edits.append(index)
+        self.version += 1
+
+    def mark_all_changed(self):
+        # For bulk rewrites of the state buffer: consumers must rebuild
+        self.version += 1
+        self.edits = []
+        self.edits_base = self.version
+        self.adjacency = None
+        self.mark_all_dirty()
+
+    def mark_all_dirty(self):
+        # For bulk rewrites that leave barriers and costs alone: only the
+        # renderer has to catch up
+        self.repaints += 1
+
+    def build_adjacency(self):
+        """
+        Builds the neighbor bitmasks for the whole grid. Each direction's bit
+        is ORed in place from a shifted slice of the passable map, so the work
+        happens in NumPy with one cell-sized scratch array rather than in a
+        loop over cells.
+        """
+        rows, cols, size = self.rows, self.cols, self.size
+        state = np.frombuffer(self.state, dtype=np.uint8, count=size)
+        passable = (state != BARRIER).view(np.uint8).reshape(rows, cols)
+        scratch = np.empty_like(passable)
+        self.adjacency = bytearray(size)
+        masks = np.frombuffer(self.adjacency, dtype=np.uint8).reshape(rows, cols)
+        for bit, target, source in (
+            (DOWN, np.s_[:-1, :], np.s_[1:, :]),
+            (UP, np.s_[1:, :], np.s_[:-1, :]),
+            (RIGHT, np.s_[:, :-1], np.s_[:, 1:]),
+            (LEFT, np.s_[:, 1:], np.s_[:, :-1]),
+        ):
+            shifted = scratch[target]
+            np.multiply(passable[source], bit, out=shifted)
+            masks[target] |= shifted
+        return self.adjacency
+
+    def update_adjacency(self, index, passable):
+        # The cell's own bits don't change; its four neighbors gain or lose it
+        adjacency = self.adjacency
+        cols = self.cols
+        row, col = divmod(index, cols)
+        for neighbor, bit, inside in (
+            (index - cols, DOWN, row > 0),
+            (index + cols, UP, row < self.rows - 1),
+            (index - 1, RIGHT, col > 0),
+            (index + 1, LEFT, col < cols - 1),
+        ):
+            if inside:
+                if passable:
+                    adjacency[neighbor] |= bit
+                else:
+                    adjacency[neighbor] &= ~bit
+
+    def edits_since(self, version):
+        """
+        Cells whose barrier status or cost changed after `version`, or None if
+        the log no longer reaches back that far (the caller should start over).
+        """
+        if version < self.edits_base:
+            return None
+        return self.edits[version - self.edits_base :]
+
+    def is_barrier(self, index):
+        return self.state[index] == BARRIER
+
+    def clear_search(self):
+        # Drop open/closed/path colouring left behind by a previous run
+        self.state[:] = bytes(self.state).translate(CLEAR_SEARCH)
+        self.mark_all_dirty()
+
+    def neighbors(self, index):
+        # Passable cells among DOWN, UP, RIGHT, LEFT, from the cached bitmasks
+        adjacency = self.adjacency
+        if adjacency is None:
+            adjacency = self.build_adjacency()
+        return [index + step for step in self.steps[adjacency[index]]]
+
+    def heuristic(self, a, b):
+        a_row, a_col = divmod(a, self.cols)
+        b_row, b_col = divmod(b, self.cols)
+        return abs(a_row - b_row) + abs(a_col - b_col)
+
+
+def generate_random_maze(grid, barrier_probability=0.3):
+    """
+    Fills the grid with barriers based on the given probability.
+
+    :param grid: The Grid to fill.
+    :param barrier_probability: Probability of a cell being a barrier.
+    """
+    # Everything except the start and end nodes is cleared or made a barrier
+    state = grid.state
+    for index in range(grid.size):
+        if state[index] != START and state[index] != END:
+            if random.random() < barrier_probability:
+                state[index] = BARRIER
+            else:
+                state[index] = EMPTY
+    grid.mark_all_changed()
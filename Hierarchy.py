@@ -0,0 +1,306 @@
+from heapq import heappush, heappop
+
+from Queues import make_queue
+from Search import INF, _finish, aStar, reconstruct_path, stepwise
+
+# Runs of at least this many cells get a transition at each end, shorter runs
+# one in the middle
+LONG_RUN = 6
+
+# Hierarchy hpa_star keeps for the last grid it searched
+_kept = None
+
+
+class Hierarchy:
+    """
+    Hierarchical planner (HPA*, Botea, Mueller & Schaeffer) over a 4-connected
+    Grid. The grid is cut into square clusters; each run of free cell pairs
+    across a cluster border gets one or two transitions, whose cells are the
+    nodes of a small abstract graph linked by their distances inside each
+    cluster. A query links start and end into that graph, searches it and
+    refines every abstract edge into cells within a single cluster. Paths are
+    near-optimal, typically within a few percent of the shortest.
+
+    Borders and clusters are worked out the first time a search reaches them
+    and kept between queries. Barrier and cost edits are read from the grid's
+    edit log and drop only the clusters (and borders) they touch; a bulk
+    rewrite of the grid starts over.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_cols = -(-grid.cols // cluster_size)
+        self.reset()
+
+    def reset(self):
+        self.version = self.grid.version
+        self.transitions = {}  # Border key -> [(cell, cell across), ...]
+        self.edges = {}  # Cluster -> {node: [(node, cost), ...]}
+
+    def matches(self, grid):
+        # A counting wrapper (Instrumentation.CountingGraph) stands for the
+        # grid it wraps
+        return getattr(grid, "graph", grid) is getattr(self.grid, "graph", self.grid)
+
+    def cluster_of(self, cell):
+        row, col = divmod(cell, self.grid.cols)
+        size = self.cluster_size
+        return (row // size) * self.cluster_cols + col // size
+
+    def bounds(self, cluster):
+        # (top, left, bottom, right), inclusive
+        size = self.cluster_size
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        top = cluster_row * size
+        left = cluster_col * size
+        bottom = min(top + size, self.grid.rows) - 1
+        right = min(left + size, self.grid.cols) - 1
+        return top, left, bottom, right
+
+    def borders(self, cluster):
+        # Keys of the borders around a cluster: ("right", c) is the border
+        # between c and the cluster to its right, ("down", c) the one below
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        keys = []
+        if cluster_col > 0:
+            keys.append(("right", cluster - 1))
+        if cluster_col < self.cluster_cols - 1:
+            keys.append(("right", cluster))
+        if cluster_row > 0:
+            keys.append(("down", cluster - self.cluster_cols))
+        if cluster_row < self.cluster_rows - 1:
+            keys.append(("down", cluster))
+        return keys
+
+    def border_transitions(self, key):
+        transitions = self.transitions.get(key)
+        if transitions is not None:
+            return transitions
+
+        grid = self.grid
+        is_barrier = grid.is_barrier
+        cols = grid.cols
+        direction, cluster = key
+        top, left, bottom, right = self.bounds(cluster)
+        if direction == "right":
+            # Column `right` of this cluster against column right + 1
+            pairs = [
+                (row * cols + right, row * cols + right + 1)
+                for row in range(top, bottom + 1)
+            ]
+        else:
+            pairs = [
+                (bottom * cols + col, (bottom + 1) * cols + col)
+                for col in range(left, right + 1)
+            ]
+
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and not (is_barrier(pair[0]) or is_barrier(pair[1])):
+                run.append(pair)
+                continue
+            if run:
+                if len(run) >= LONG_RUN:
+                    transitions += [run[0], run[-1]]
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        self.transitions[key] = transitions
+        return transitions
+
+    def cluster_edges(self, cluster):
+        """
+        Abstract edges leaving the nodes of `cluster`: the steps across its
+        borders and the shortest distances between its nodes inside it.
+        """
+        edges = self.edges.get(cluster)
+        if edges is not None:
+            return edges
+
+        cost = self.grid.cost
+        edges = {}
+        for key in self.borders(cluster):
+            for a, b in self.border_transitions(key):
+                if self.cluster_of(a) != cluster:
+                    a, b = b, a
+                edges.setdefault(a, []).append((b, cost(b)))
+        nodes = list(edges)
+        for node in nodes:
+            distance = self.local_search(node, cluster)[0]
+            for other in nodes:
+                if other != node and other in distance:
+                    edges[node].append((other, distance[other]))
+        self.edges[cluster] = edges
+        return edges
+
+    def local_search(self, source, cluster, target=None, reverse=False):
+        """
+        Dijkstra from `source` confined to `cluster`, stopping early once
+        `target` is settled.
+
+        :param reverse: Measure distances to `source` instead of from it.
+        :return: (distance, came_from, expanded) over the cells reached.
+        """
+        grid = self.grid
+        cols = grid.cols
+        costs = grid.costs
+        top, left, bottom, right = self.bounds(cluster)
+        distance = {source: 0}
+        came_from = {}
+        queue = [(0, source)]
+        expanded = 0
+        while queue:
+            current_distance, current = heappop(queue)
+            if current_distance > distance[current]:
+                continue
+            if current == target:
+                break
+            expanded += 1
+            for neighbor in grid.neighbors(current):
+                row, col = divmod(neighbor, cols)
+                if not (top <= row <= bottom and left <= col <= right):
+                    continue
+                if costs is None:
+                    step = 1
+                else:
+                    step = costs[current] if reverse else costs[neighbor]
+                new_distance = current_distance + step
+                if new_distance < distance.get(neighbor, INF):
+                    distance[neighbor] = new_distance
+                    came_from[neighbor] = current
+                    heappush(queue, (new_distance, neighbor))
+        return distance, came_from, expanded
+
+    def apply_edits(self):
+        edits = self.grid.edits_since(self.version)
+        if edits is None:
+            self.reset()
+            return
+        self.version = self.grid.version
+        size = self.cluster_size
+        cols = self.grid.cols
+        for cell in set(edits):
+            cluster = self.cluster_of(cell)
+            self.edges.pop(cluster, None)
+            # A cell on a cluster's edge also changes the border it lies on,
+            # and with it the nodes of the cluster across
+            row, col = divmod(cell, cols)
+            across = []
+            if row % size == 0 and row > 0:
+                across.append(
+                    (("down", cluster - self.cluster_cols), -self.cluster_cols)
+                )
+            if row % size == size - 1 and row < self.grid.rows - 1:
+                across.append((("down", cluster), self.cluster_cols))
+            if col % size == 0 and col > 0:
+                across.append((("right", cluster - 1), -1))
+            if col % size == size - 1 and col < cols - 1:
+                across.append((("right", cluster), 1))
+            for key, offset in across:
+                self.transitions.pop(key, None)
+                self.edges.pop(cluster + offset, None)
+
+    def search_steps(self, start, end, observer=None):
+        """
+        Step generator for one query (see Search.stepwise). The result's
+        `expanded` counts abstract nodes plus the cells expanded while linking
+        start and end in and refining the path.
+        """
+        self.apply_edits()
+        grid = self.grid
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+
+        # Link start and end to the nodes of their clusters
+        start_distance, _, expanded = self.local_search(start, start_cluster)
+        start_edges = [
+            (node, start_distance[node])
+            for node in self.cluster_edges(start_cluster)
+            if node in start_distance
+        ]
+        if start_cluster == end_cluster and end in start_distance:
+            start_edges.append((end, start_distance[end]))
+        end_distance, _, end_expanded = self.local_search(
+            end, end_cluster, reverse=True
+        )
+        expanded += end_expanded
+        to_end = {
+            node: end_distance[node]
+            for node in self.cluster_edges(end_cluster)
+            if node in end_distance
+        }
+
+        open_set = make_queue(grid)
+        open_set.push(start, grid.heuristic(start, end))
+        came_from = {}
+        g_score = {start: 0}
+
+        while open_set:
+            current = open_set.pop()[1]
+
+            if current == end:
+                path, refine_expanded = self.refine(came_from, end)
+                yield from _finish(grid, observer, path, expanded + refine_expanded)
+                return
+
+            expanded += 1
+            if current == start:
+                steps = list(start_edges)
+            else:
+                steps = []
+            steps += self.cluster_edges(self.cluster_of(current)).get(current, [])
+            if current in to_end:
+                steps.append((end, to_end[current]))
+            for neighbor, cost in steps:
+                temp_g_score = g_score[current] + cost
+                if temp_g_score < g_score.get(neighbor, INF):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    if observer is not None and neighbor not in open_set:
+                        observer.opened(neighbor)
+                    open_set.push(
+                        neighbor, temp_g_score + grid.heuristic(neighbor, end)
+                    )
+
+            if observer is not None:
+                observer.closed(current)
+            yield
+
+        yield from _finish(grid, observer, [], expanded)
+
+    def refine(self, came_from, end):
+        # Abstract path back to cells: each edge is either one step across a
+        # border or a route inside a single cluster
+        nodes = reconstruct_path(came_from, end)
+
+        path = nodes[:1]
+        expanded = 0
+        for a, b in zip(nodes, nodes[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)
+                continue
+            _, local_came_from, local_expanded = self.local_search(
+                a, self.cluster_of(a), target=b
+            )
+            expanded += local_expanded
+            segment = [b]
+            while segment[-1] != a:
+                segment.append(local_came_from[segment[-1]])
+            path += reversed(segment[:-1])
+        return path, expanded
+
+
+@stepwise
+def hpa_star(graph, start, end, observer=None):
+    # Keeps the clusters of the last grid it searched, so a run of queries (a
+    # batch worker's) works each one out once. Only 4-way grids have
+    # clusters, anything else runs aStar.
+    global _kept
+    if getattr(graph, "connectivity", None) != 4:
+        return aStar.steps(graph, start, end, observer)
+    if _kept is None or not _kept.matches(graph):
+        _kept = Hierarchy(graph)
+    return _kept.search_steps(start, end, observer)
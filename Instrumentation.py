@@ -0,0 +1,247 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from Fonts import get_font
+from Search import SearchObserver
+
+# Counters and timers for the visualizer's hot paths. Counting wraps the graph,
+# its priority queue and the search observer, so nothing is paid while
+# instrumentation is off. Timings and counter samples are kept as Chrome trace
+# events, which chrome://tracing, Perfetto and speedscope load directly.
+
+
+class Stats:
+    def __init__(self):
+        self.enabled = False
+        self.label = None  # Algorithm of the current run
+        self.counters = defaultdict(int)
+        self.timings = {}  # Phase -> duration of its last run, in seconds
+        self.events = []
+        self.origin = time.perf_counter()
+        self.frames = 0
+        self.skipped = 0
+        self._graph = None
+
+    def begin_run(self, label):
+        self.counters.clear()
+        self.events = []
+        self.frames = 0
+        self.skipped = 0
+        self.label = label
+
+    def instrument(self, graph, observer):
+        """
+        Counting versions of `graph` and `observer` for one search. The graph
+        wrapper is reused while the grid stays the same, so planners that
+        check graph identity between runs (D* Lite) keep working.
+        """
+        if self._graph is None or self._graph.graph is not graph:
+            self._graph = CountingGraph(graph, self.counters)
+        return self._graph, CountingObserver(observer, self.counters)
+
+    def now(self):
+        # Microseconds since the Stats was created, the unit of trace events
+        return (time.perf_counter() - self.origin) * 1e6
+
+    @contextmanager
+    def timed(self, name):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - began
+            self.timings[name] = duration
+            if self.enabled:
+                self.events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": (began - self.origin) * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": 1,
+                        "tid": 1,
+                    }
+                )
+
+    def frame(self, elapsed_ms, fps):
+        """
+        Records the end of a frame that took `elapsed_ms`; frames that ran
+        over their slot count the slots they missed as skipped.
+        """
+        self.frames += 1
+        self.skipped += max(int(elapsed_ms * fps / 1000) - 1, 0)
+        if self.enabled:
+            self.events.append(
+                {
+                    "name": "counters",
+                    "ph": "C",
+                    "ts": self.now(),
+                    "pid": 1,
+                    "args": dict(self.counters, skipped=self.skipped),
+                }
+            )
+
+    def summary(self):
+        counters = self.counters
+        timings = self.timings
+        return (
+            "expanded {}  heap {}/{}  neighbors {}  search {:.1f}ms  "
+            "render {:.1f}ms  display {:.1f}ms  skipped {}".format(
+                counters["expanded"],
+                counters["pushes"],
+                counters["pops"],
+                counters["neighbors"],
+                timings.get("search", 0) * 1000,
+                timings.get("render", 0) * 1000,
+                timings.get("display", 0) * 1000,
+                self.skipped,
+            )
+        )
+
+    def export(self, path):
+        """
+        Writes the trace recorded since begin_run() as Chrome trace JSON.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+class CountingGraph:
+    # Forwards everything to the wrapped graph, counting neighbor generation
+    def __init__(self, graph, counters):
+        self.graph = graph
+        self.counters = counters
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def neighbors(self, cell):
+        neighbors = list(self.graph.neighbors(cell))
+        self.counters["neighbor calls"] += 1
+        self.counters["neighbors"] += len(neighbors)
+        return neighbors
+
+    def counting_queue(self, queue):
+        # Picked up by Queues.make_queue for queues built on this graph
+        return CountingQueue(queue, self.counters)
+
+
+class CountingQueue:
+    def __init__(self, queue, counters):
+        self.queue = queue
+        self.counters = counters
+
+    def push(self, item, priority):
+        self.counters["pushes"] += 1
+        self.queue.push(item, priority)
+
+    def pop(self):
+        self.counters["pops"] += 1
+        return self.queue.pop()
+
+    def peek(self):
+        return self.queue.peek()
+
+    def remove(self, item):
+        self.counters["removes"] += 1
+        self.queue.remove(item)
+
+    def __contains__(self, item):
+        return item in self.queue
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class CountingObserver(SearchObserver):
+    def __init__(self, observer, counters):
+        self.observer = observer
+        self.counters = counters
+
+    def opened(self, cell):
+        self.counters["opened"] += 1
+        self.observer.opened(cell)
+
+    def closed(self, cell):
+        self.counters["expanded"] += 1
+        self.observer.closed(cell)
+
+    def path(self, cell):
+        self.observer.path(cell)
+
+    def finished(self, result):
+        self.observer.finished(result)
+
+
+class Overlay:
+    """
+    One line of live statistics, drawn by the Renderer like a widget in the
+    button bar. The text only changes a few times a second so it stays
+    readable and cheap to redraw.
+    """
+
+    def __init__(self, x, y, width, height, interval=0.25):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = (255, 255, 255)
+        self.text = ""
+        self.interval = interval
+        self.updated = 0
+
+    def update(self, stats):
+        now = time.perf_counter()
+        if now - self.updated >= self.interval:
+            self.updated = now
+            self.text = stats.summary() if stats.enabled else ""
+
+    def draw(self, win, outline=None):
+        win.fill(self.color, (self.x, self.y, self.width, self.height))
+        if self.text:
+            text = get_font("consolas", 14).render(self.text, 1, (60, 60, 60))
+            win.blit(text, (self.x, self.y + (self.height - text.get_height()) // 2))
+
+
+def profile_call(func, profiler="cprofile", output=None):
+    """
+    Runs func() under a profiler and returns its result.
+
+    :param profiler: "cprofile" writes pstats data (snakeviz, pstats,
+        gprof2dot); "pyinstrument" writes an HTML report and needs the
+        optional pyinstrument package.
+    :param output: Report path; a summary is also printed to stdout.
+    """
+    if profiler == "cprofile":
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        result = profile.runcall(func)
+        if output:
+            profile.dump_stats(output)
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(15)
+        return result
+
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profile = Profiler()
+        profile.start()
+        try:
+            result = func()
+        finally:
+            profile.stop()
+        if output:
+            with open(output, "w") as f:
+                f.write(profile.output_html())
+        print(profile.output_text())
+        return result
+
+    raise ValueError("Unknown profiler {!r}".format(profiler))
@@ -0,0 +1,238 @@
+import mmap
+import os
+import struct
+from array import array
+
+from Grid import Grid, CLEAR_SEARCH, SMALL_COST
+from Hierarchy import Hierarchy
+
+# Binary map files: a grid's cells, its cost layer and whatever was worked out
+# from them (neighbor bitmasks, distance fields, HPA* clusters), laid out so a
+# loader can map the file and use the sections in place. Opening a map then
+# costs no reading or parsing however large it is, and processes mapping the
+# same file read-only share one copy of it in the page cache.
+#
+# Layout, all little-endian:
+#   header   magic, format version, rows, cols, largest cost, section count
+#   table    one (tag, offset, length) entry per section
+#   sections each starting on a SECTION_ALIGN boundary
+# Sections:
+#   CELL  one state byte per cell, search colouring cleared
+#   COST  one cost byte per cell, only when the grid has terrain
+#   ADJC  Grid.adjacency neighbor bitmasks
+#   DIST  int32 source cell, then that source's int32 distance field; one
+#         section per field
+#   HIER  int64 words describing a Hierarchy (see _pack_hierarchy)
+
+MAGIC = b"PFMAP\x00"
+FORMAT_VERSION = 1
+SECTION_ALIGN = 64
+
+_HEADER = struct.Struct("<6sHIIII")
+_ENTRY = struct.Struct("<4sQQ")
+
+# Copies the state buffer this many bytes at a time when saving
+_CHUNK = 1 << 24
+
+
+class StoredMap:
+    """
+    A map file opened by load().
+
+    :ivar grid: Grid whose state, costs and adjacency are views into the file.
+    :ivar fields: Distance fields by source cell, read-only NumPy arrays of
+        shape (rows, cols). They describe the grid as saved, not later edits.
+    """
+
+    def __init__(self, grid, fields, hierarchy_words):
+        self.grid = grid
+        self.fields = fields
+        self._hierarchy_words = hierarchy_words
+
+    def hierarchy(self):
+        """
+        The saved HPA* clusters as a Hierarchy over `grid`, or None if the
+        file has none. Unlike the other sections this one is unpacked.
+        """
+        if self._hierarchy_words is None:
+            return None
+        return _unpack_hierarchy(self.grid, self._hierarchy_words)
+
+
+def save(path, grid, fields=None, hierarchy=None):
+    """
+    Writes `grid` and its cached structures to a map file.
+
+    :param grid: The Grid to save; its neighbor bitmasks are built if missing.
+    :param fields: Optional dict of source cell -> DistanceField.distance_field
+        array to store.
+    :param hierarchy: Optional Hierarchy over `grid`; it is brought up to date
+        with the grid first and the clusters it has worked out are stored.
+    """
+    adjacency = grid.adjacency
+    if adjacency is None:
+        adjacency = grid.build_adjacency()
+
+    sections = [(b"CELL", grid.size, _write_state(grid))]
+    if grid.costs is not None:
+        sections.append((b"COST", grid.size, _write_buffer(grid.costs)))
+    sections.append((b"ADJC", grid.size, _write_buffer(adjacency)))
+    for source, field in (fields or {}).items():
+        data = struct.pack("<i", source) + field.astype("<i4").tobytes()
+        sections.append((b"DIST", len(data), _write_buffer(data)))
+    if hierarchy is not None:
+        hierarchy.apply_edits()
+        data = _pack_hierarchy(hierarchy).tobytes()
+        sections.append((b"HIER", len(data), _write_buffer(data)))
+
+    offset = _align(_HEADER.size + _ENTRY.size * len(sections))
+    table = []
+    for tag, length, _ in sections:
+        table.append((tag, offset, length))
+        offset = _align(offset + length)
+
+    # Written aside and moved into place: maps of the old file stay valid
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                grid.rows,
+                grid.cols,
+                grid.max_cost,
+                len(sections),
+            )
+        )
+        for entry in table:
+            f.write(_ENTRY.pack(*entry))
+        for (tag, offset, length), (_, _, write) in zip(table, sections):
+            f.write(b"\x00" * (offset - f.tell()))
+            write(f)
+    os.replace(temporary, path)
+
+
+def load(path, writable=True):
+    """
+    Maps a map file into memory; nothing is read until it is used.
+
+    :param writable: With True (the default) edits land in private
+        copy-on-write pages and never reach the file. With False the mapping
+        is read-only and shared with every other process mapping the file
+        that way; editing the grid then raises TypeError.
+    :return: A StoredMap.
+    """
+    with open(path, "rb") as f:
+        access = mmap.ACCESS_COPY if writable else mmap.ACCESS_READ
+        buffer = mmap.mmap(f.fileno(), 0, access=access)
+    view = memoryview(buffer)
+
+    if len(buffer) < _HEADER.size:
+        raise ValueError("{} is not a map file".format(path))
+    magic, version, rows, cols, max_cost, count = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("{} is not a map file".format(path))
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            "{} has format version {}, expected {}".format(
+                path, version, FORMAT_VERSION
+            )
+        )
+    if _HEADER.size + count * _ENTRY.size > len(buffer):
+        raise ValueError("{} is truncated".format(path))
+
+    # Every section must lie inside the file and have its expected size
+    size = rows * cols
+    lengths = {b"CELL": size, b"COST": size, b"ADJC": size, b"DIST": 4 + 4 * size}
+    table = []
+    for i in range(count):
+        tag, offset, length = _ENTRY.unpack_from(buffer, _HEADER.size + i * _ENTRY.size)
+        if offset + length > len(buffer):
+            raise ValueError("{} is truncated".format(path))
+        if length != lengths.get(tag, length) or (tag == b"HIER" and length % 8):
+            name = tag.decode("ascii", "replace")
+            raise ValueError("{} has a damaged {} section".format(path, name))
+        table.append((tag, offset, length))
+    if b"CELL" not in (tag for tag, _, _ in table):
+        raise ValueError("{} has no cells".format(path))
+
+    # The cells first: the other sections attach to their Grid
+    table.sort(key=lambda entry: entry[0] != b"CELL")
+    grid = None
+    fields = {}
+    hierarchy_words = None
+    for tag, offset, length in table:
+        section = view[offset : offset + length]
+        if tag == b"CELL":
+            grid = Grid(rows, cols, state=section)
+        elif tag == b"COST":
+            grid.costs = section
+            grid.max_cost = max_cost
+            grid.integer_costs = max_cost <= SMALL_COST
+        elif tag == b"ADJC":
+            grid.adjacency = section
+        elif tag == b"DIST":
+            import numpy as np
+
+            source = struct.unpack_from("<i", section)[0]
+            field = np.frombuffer(buffer, "<i4", rows * cols, offset + 4)
+            field.flags.writeable = False
+            fields[source] = field.reshape(rows, cols)
+        elif tag == b"HIER":
+            hierarchy_words = section.cast("q")
+    return StoredMap(grid, fields, hierarchy_words)
+
+
+def _align(offset):
+    return -(-offset // SECTION_ALIGN) * SECTION_ALIGN
+
+
+def _write_buffer(data):
+    return lambda f: f.write(data)
+
+
+def _write_state(grid):
+    def write(f):
+        state = grid.state
+        for begin in range(0, grid.size, _CHUNK):
+            f.write(bytes(state[begin : begin + _CHUNK]).translate(CLEAR_SEARCH))
+
+    return write
+
+
+def _pack_hierarchy(hierarchy):
+    # cluster size, border count, per border: direction (0 right, 1 down),
+    # cluster, transition count, (cell, cell across) pairs; then cluster count,
+    # per cluster: cluster, node count, per node: node, edge count,
+    # (node, cost) pairs
+    words = array("q", [hierarchy.cluster_size, len(hierarchy.transitions)])
+    for (direction, cluster), transitions in hierarchy.transitions.items():
+        words += array("q", [direction == "down", cluster, len(transitions)])
+        for pair in transitions:
+            words += array("q", pair)
+    words.append(len(hierarchy.edges))
+    for cluster, edges in hierarchy.edges.items():
+        words += array("q", [cluster, len(edges)])
+        for node, steps in edges.items():
+            words += array("q", [node, len(steps)])
+            for step in steps:
+                words += array("q", step)
+    return words
+
+
+def _unpack_hierarchy(grid, words):
+    words = iter(words)
+    hierarchy = Hierarchy(grid, next(words))
+    for _ in range(next(words)):
+        direction = "down" if next(words) else "right"
+        cluster = next(words)
+        hierarchy.transitions[direction, cluster] = [
+            (next(words), next(words)) for _ in range(next(words))
+        ]
+    for _ in range(next(words)):
+        cluster = next(words)
+        edges = hierarchy.edges[cluster] = {}
+        for _ in range(next(words)):
+            node = next(words)
+            edges[node] = [(next(words), next(words)) for _ in range(next(words))]
+    return hierarchy
@@ -0,0 +1,300 @@
+import numpy as np
+
+from Grid import BARRIER, EMPTY, START, END
+
+# Seeded maze generators, vectorized with NumPy so even multi-million-cell
+# maps take a fraction of a second. Each generator takes (rows, cols, rng)
+# plus its own keyword options and returns a bool array of shape (rows, cols),
+# True where a barrier goes; generate() writes one into a Grid.
+#
+# The perfect-maze generators (recursive division, spanning tree) work on a
+# lattice: cells sit at odd (row, col), the walls between them at odd/even
+# positions and pillars at even/even ones, inside a one-cell frame. Maps with
+# an even side keep an extra row or column of frame.
+
+# Share of the walls, the lightest, whose spanning forest spanning_tree finds
+# before looking at the rest
+LIGHT_WALLS = 0.6
+
+
+def random_field(rows, cols, rng, density=0.3):
+    """
+    Uniform noise: every cell is a barrier with probability `density`.
+    """
+    return rng.random((rows, cols), dtype=np.float32) < density
+
+
+def caves(rows, cols, rng, fill=0.45, steps=4):
+    """
+    Cellular-automaton caves: random noise smoothed `steps` times by turning
+    every cell with at least five barriers in its 3x3 block (the map edge
+    counts as barrier) into a barrier and every other cell into floor.
+    """
+    walls = rng.random((rows, cols), dtype=np.float32) < fill
+    padded = np.ones((rows + 2, cols + 2), dtype=np.uint8)
+    count = np.empty((rows, cols), dtype=np.uint8)
+    for _ in range(steps):
+        padded[1:-1, 1:-1] = walls
+        count[...] = padded[:-2, :-2]
+        for dr, dc in ((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)):
+            count += padded[dr : dr + rows, dc : dc + cols]
+        walls = count >= 5
+    return walls
+
+
+def recursive_division(rows, cols, rng):
+    """
+    Recursive division: an open chamber is split by a wall with a single gap
+    and both halves are divided in turn until every chamber is one cell wide.
+    Chambers at the same depth are independent, so each depth is split at
+    once instead of one chamber per call.
+    """
+    walls = _frame(rows, cols)
+    lattice_rows, lattice_cols = (rows - 1) // 2, (cols - 1) // 2
+    walls[1 : 2 * lattice_rows, 1 : 2 * lattice_cols] = False
+    flat = walls.ravel()
+
+    # Chambers in lattice cells: top, left, height, width. A chamber one cell
+    # wide or high is a finished corridor: any wall across it would be all gap.
+    top = np.zeros(1, dtype=np.int64)
+    left = np.zeros(1, dtype=np.int64)
+    height = np.array([lattice_rows], dtype=np.int64)
+    width = np.array([lattice_cols], dtype=np.int64)
+    while True:
+        divisible = np.flatnonzero((height > 1) & (width > 1))
+        top, left = top.take(divisible), left.take(divisible)
+        height, width = height.take(divisible), width.take(divisible)
+        if not top.size:
+            break
+
+        # Split across the longer side, either way for square chambers
+        horizontal = np.where(
+            height == width, rng.random(top.size) < 0.5, height > width
+        )
+        across = np.where(horizontal, height, width)
+        along = np.where(horizontal, width, height)
+        split = 1 + (rng.random(top.size) * (across - 1)).astype(np.int64)
+        gap = (rng.random(top.size) * along).astype(np.int64)
+
+        # Wall cells from (row, col) onwards, `step` apart in the flat map
+        row = np.where(horizontal, 2 * (top + split), 2 * top + 1)
+        col = np.where(horizontal, 2 * left + 1, 2 * (left + split))
+        step = np.where(horizontal, 1, cols)
+        first = row * cols + col
+        length = 2 * along - 1
+        flat[_runs(first, step, length)] = True
+        flat[first + step * 2 * gap] = False
+
+        top, left, height, width = (
+            np.concatenate(pair)
+            for pair in (
+                (top, np.where(horizontal, top + split, top)),
+                (left, np.where(horizontal, left, left + split)),
+                (
+                    np.where(horizontal, split, height),
+                    np.where(horizontal, height - split, height),
+                ),
+                (
+                    np.where(horizontal, width, split),
+                    np.where(horizontal, width, width - split),
+                ),
+            )
+        )
+    return walls
+
+
+def spanning_tree(rows, cols, rng):
+    """
+    Perfect maze from a random spanning tree: the minimum spanning tree of
+    the lattice under uniformly random wall weights, which is the maze both
+    randomized Kruskal and weighted randomized Prim produce. It is computed
+    with Boruvka's algorithm, where every round joins each region to its
+    neighbor across its lightest wall, all regions at once.
+    """
+    walls = _frame(rows, cols)
+    lattice_rows, lattice_cols = (rows - 1) // 2, (cols - 1) // 2
+    cells = lattice_rows * lattice_cols
+    if not cells:
+        return walls
+    walls[1 : 2 * lattice_rows : 2, 1 : 2 * lattice_cols : 2] = False
+
+    # Wall weights, the horizontal neighbors' walls first, in map order.
+    # Weights are random with the wall's position in the low bits, so no two
+    # are equal and the tree is the same for a seed however it is found.
+    across = lattice_rows * (lattice_cols - 1)
+    count = across + (lattice_rows - 1) * lattice_cols
+    bits = count.bit_length()
+    weight = rng.integers(0, 1 << (62 - bits), count, dtype=np.int64) << bits
+    weight |= np.arange(count)
+    right = weight[:across].reshape(lattice_rows, lattice_cols - 1)
+    down = weight[across:].reshape(lattice_rows - 1, lattice_cols)
+
+    # First round on the lattice itself: a cell's lightest wall is the least
+    # of its four neighbors' arrays, with no edge lists to scatter over
+    lightest = np.full((lattice_rows, lattice_cols), np.iinfo(np.int64).max)
+    np.minimum(lightest[:, :-1], right, out=lightest[:, :-1])
+    np.minimum(lightest[:, 1:], right, out=lightest[:, 1:])
+    np.minimum(lightest[:-1, :], down, out=lightest[:-1, :])
+    np.minimum(lightest[1:, :], down, out=lightest[1:, :])
+    from_left = right == lightest[:, :-1]
+    from_right = right == lightest[:, 1:]
+    from_top = down == lightest[:-1, :]
+    from_bottom = down == lightest[1:, :]
+    horizontal = walls[1 : 2 * lattice_rows : 2, 2 : 2 * lattice_cols - 1 : 2]
+    horizontal &= ~(from_left | from_right)
+    vertical = walls[2 : 2 * lattice_rows - 1 : 2, 1 : 2 * lattice_cols : 2]
+    vertical &= ~(from_top | from_bottom)
+
+    # Every cell points at the neighbor across its lightest wall, as an
+    # offset; exactly one of its walls is its lightest
+    offset = np.zeros((lattice_rows, lattice_cols), dtype=np.int32)
+    offset[:, :-1] += from_left
+    offset[:, 1:] -= from_right
+    offset[:-1, :] += lattice_cols * from_top.astype(np.int32)
+    offset[1:, :] -= lattice_cols * from_bottom.astype(np.int32)
+    parent = np.arange(cells, dtype=np.int32) + offset.ravel()
+    regions, label = _merge(parent)
+    label = label.reshape(lattice_rows, lattice_cols)
+
+    # The lattice walls by direction: where the cells on either side sit in
+    # the lattice, where the wall sits in the map, and the weights
+    positions = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+    sides = (
+        (
+            np.s_[:, :-1],
+            np.s_[:, 1:],
+            positions[1 : 2 * lattice_rows : 2, 2 : 2 * lattice_cols - 1 : 2],
+            right,
+        ),
+        (
+            np.s_[:-1, :],
+            np.s_[1:, :],
+            positions[2 : 2 * lattice_rows - 1 : 2, 1 : 2 * lattice_cols : 2],
+            down,
+        ),
+    )
+
+    # Filter-Kruskal: the tree of the lighter walls first, then the heavier
+    # walls still between two of its parts. Past the lattice's percolation
+    # threshold (half the walls) the light parts are mostly one, so few heavy
+    # walls are left to join them, and the rounds only carry the light ones.
+    flat = walls.ravel()
+    regions, component = _boruvka(regions, *_crossing(label, sides, True), flat)
+    _boruvka(regions, *_crossing(component.take(label), sides, False), flat)
+    return walls
+
+
+def _crossing(label, sides, light):
+    # The light or the heavy lattice walls between two regions of `label`, as
+    # the regions on either side, the wall's flat index and its weight
+    limit = int(LIGHT_WALLS * (1 << 62))
+    parts = []
+    for first, second, position, weight in sides:
+        first, second = label[first], label[second]
+        keep = np.flatnonzero((first != second) & ((weight < limit) == light))
+        parts.append(
+            [array.ravel().take(keep) for array in (first, second, position, weight)]
+        )
+    return [np.concatenate(arrays) for arrays in zip(*parts)]
+
+
+def _boruvka(regions, a, b, wall, weight, flat):
+    """
+    Minimum spanning forest over `regions` numbered regions and the edges
+    (a, b) between them, opening each chosen edge's `wall` in `flat`. Regions
+    are renumbered 0..regions-1 after every round. Returns the number of trees
+    and the tree of each region.
+    """
+    component = np.arange(regions, dtype=np.int32)
+    while a.size:
+        lightest = np.full(regions, np.iinfo(np.int64).max)
+        np.minimum.at(lightest, a, weight)
+        np.minimum.at(lightest, b, weight)
+        # Positions rather than masks: indexing with a random-looking boolean
+        # mask is several times slower than take()
+        from_a = np.flatnonzero(weight == lightest.take(a))
+        from_b = np.flatnonzero(weight == lightest.take(b))
+        flat[wall.take(from_a)] = False
+        flat[wall.take(from_b)] = False
+
+        # Each region points at the region across its lightest edge
+        parent = np.arange(regions, dtype=np.int32)
+        parent[a.take(from_a)] = b.take(from_a)
+        parent[b.take(from_b)] = a.take(from_b)
+        regions, label = _merge(parent)
+        component = label.take(component)
+
+        a, b = label.take(a), label.take(b)
+        keep = np.flatnonzero(a != b)
+        a, b = a.take(keep), b.take(keep)
+        wall, weight = wall.take(keep), weight.take(keep)
+    return regions, component
+
+
+def _merge(parent):
+    """
+    Joins the regions of one Boruvka round, `parent` pointing each region at
+    the one across its lightest edge. Returns the number of merged regions and
+    every old region's new number.
+    """
+    # Two regions that picked the same edge point at each other, and the lower
+    # one becomes the root
+    own = np.arange(parent.size, dtype=np.int32)
+    mutual = np.flatnonzero((parent[parent] == own) & (own < parent))
+    parent[mutual] = mutual
+    # Pointer jumping, over the regions not yet pointing at their root
+    active = np.flatnonzero(parent[parent] != parent)
+    while active.size:
+        parent[active] = parent[parent[active]]
+        active = active[parent[parent[active]] != parent[active]]
+    roots = np.cumsum(parent == own, dtype=np.int32)
+    return int(roots[-1]), (roots - 1).take(parent)
+
+
+GENERATORS = {
+    "Random": random_field,
+    "Caves": caves,
+    "Division": recursive_division,
+    "Kruskal": spanning_tree,
+}
+
+
+def generate(grid, kind="Random", seed=None, **options):
+    """
+    Replaces the barriers of `grid` with a generated maze. Start and end
+    cells are kept (and left open); search colouring is cleared.
+
+    :param kind: Generator name from GENERATORS.
+    :param seed: Seed for NumPy's generator; None picks a fresh one.
+    :param options: Passed on to the generator, e.g. density=0.2 for Random.
+    """
+    rows, cols = grid.rows, grid.cols
+    walls = GENERATORS[kind](rows, cols, np.random.default_rng(seed), **options)
+    state = np.frombuffer(grid.state, dtype=np.uint8, count=grid.size)
+    state = state.reshape(rows, cols)
+    keep = (state == START) | (state == END)
+    state[...] = np.where(keep, state, np.where(walls, BARRIER, EMPTY))
+    grid.mark_all_changed()
+
+
+def lattice_corners(grid):
+    # First and last lattice cells, open in every perfect maze
+    rows, cols = grid.rows, grid.cols
+    last_row = 2 * ((rows - 1) // 2) - 1
+    last_col = 2 * ((cols - 1) // 2) - 1
+    return cols + 1, last_row * cols + last_col
+
+
+def _frame(rows, cols):
+    # Everything barrier; perfect-maze generators carve the lattice out of it
+    return np.ones((rows, cols), dtype=bool)
+
+
+def _runs(first, step, length):
+    # Flat indices of every run first + step * k for k < length, concatenated:
+    # a running sum of `step`, jumping to the next run's first cell at its start
+    begins = np.cumsum(length) - length
+    increments = np.repeat(step, length)
+    increments[begins[0]] = first[0]
+    increments[begins[1:]] = first[1:] - (first[:-1] + step[:-1] * (length[:-1] - 1))
+    return np.cumsum(increments)
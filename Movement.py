@@ -0,0 +1,167 @@
+import math
+
+from Grid import BARRIER, DOWN, UP, RIGHT, LEFT
+
+# Movement models over a Grid. A Grid on its own is 4-connected with unit (or
+# terrain) step costs and Manhattan distance. OctileGrid is a view over the same
+# cells that adds diagonal steps costing sqrt(2) times the terrain cost, with the
+# octile distance as heuristic. Any-angle movement is Theta* (Search.theta_star)
+# searching over the 8-connected view with line-of-sight shortcuts.
+
+MOVEMENTS = ["4-way", "8-way", "Any-angle"]
+
+SQRT2 = math.sqrt(2)
+
+# (orthogonal neighbor bits, which side) for each diagonal, DR, DL, UR, UL
+_DIAGONALS = ((DOWN, RIGHT), (DOWN, LEFT), (UP, RIGHT), (UP, LEFT))
+
+
+class OctileGrid:
+    """
+    8-connected view over a Grid, sharing its state, costs and edit log.
+
+    :param corner_cutting: If False (the default) a diagonal step needs both
+        orthogonal cells beside it to be free, so paths never squeeze past the
+        corner of a barrier. If True one free side is enough.
+    """
+
+    connectivity = 8
+    integer_costs = False  # Diagonal steps cost sqrt(2)
+
+    def __init__(self, grid, corner_cutting=False):
+        self.grid = grid
+        self.corner_cutting = corner_cutting
+        cols = grid.cols
+        offsets = {DOWN: cols, UP: -cols, RIGHT: 1, LEFT: -1}
+        self.diagonals = [
+            (first, second, offsets[first] + offsets[second])
+            for first, second in _DIAGONALS
+        ]
+
+    def __getattr__(self, name):
+        return getattr(self.grid, name)
+
+    def neighbors(self, index):
+        grid = self.grid
+        adjacency = grid.adjacency
+        if adjacency is None:
+            adjacency = grid.build_adjacency()
+        mask = adjacency[index]
+        result = [index + step for step in grid.steps[mask]]
+        state = grid.state
+        if not self.corner_cutting:
+            for first, second, step in self.diagonals:
+                if mask & first and mask & second and state[index + step] != BARRIER:
+                    result.append(index + step)
+            return result
+
+        # Free orthogonal bits can't tell a barrier from the map edge here
+        rows, cols = grid.rows, grid.cols
+        row, col = divmod(index, cols)
+        for first, second, step in self.diagonals:
+            if not mask & (first | second):
+                continue
+            if not (0 <= row + (1 if first == DOWN else -1) < rows):
+                continue
+            if not (0 <= col + (1 if second == RIGHT else -1) < cols):
+                continue
+            if state[index + step] != BARRIER:
+                result.append(index + step)
+        return result
+
+    def step_cost(self, a, b):
+        costs = self.grid.costs
+        cost = 1 if costs is None else costs[b]
+        cols = self.grid.cols
+        if a // cols == b // cols or a % cols == b % cols:
+            return cost
+        return cost * SQRT2
+
+    def around(self, index):
+        # Every cell whose steps an edit of `index` can change: with the corner
+        # rule that includes diagonals passing beside it, so the whole 3x3 block
+        rows, cols = self.grid.rows, self.grid.cols
+        row, col = divmod(index, cols)
+        return [
+            r * cols + c
+            for r in range(max(row - 1, 0), min(row + 2, rows))
+            for c in range(max(col - 1, 0), min(col + 2, cols))
+            if r != row or c != col
+        ]
+
+    def heuristic(self, a, b):
+        # Octile distance: diagonal steps while both coordinates differ
+        cols = self.grid.cols
+        a_row, a_col = divmod(a, cols)
+        b_row, b_col = divmod(b, cols)
+        dr = abs(a_row - b_row)
+        dc = abs(a_col - b_col)
+        return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+
+def graph_for(grid, movement="4-way", corner_cutting=False):
+    """
+    The graph to search for a movement model from MOVEMENTS.
+
+    :param grid: The Grid to move on.
+    """
+    if movement == "4-way":
+        return grid
+    if movement in ("8-way", "Any-angle"):
+        return OctileGrid(grid, corner_cutting)
+    raise ValueError("Unknown movement {!r}".format(movement))
+
+
+def euclidean(a, b, cols):
+    a_row, a_col = divmod(a, cols)
+    b_row, b_col = divmod(b, cols)
+    return math.hypot(a_row - b_row, a_col - b_col)
+
+
+def walk_line(a, b, cols):
+    """
+    Yields (cell, corner) for every cell the segment between the centres of
+    cells `a` and `b` passes through, after `a`. `corner` is the pair of side
+    cells when the segment passes exactly through a grid corner, else None.
+    """
+    row, col = divmod(a, cols)
+    end_row, end_col = divmod(b, cols)
+    n_rows = abs(end_row - row)
+    n_cols = abs(end_col - col)
+    step_row = 1 if end_row > row else -1
+    step_col = 1 if end_col > col else -1
+    i_row = i_col = 0
+    while i_row < n_rows or i_col < n_cols:
+        # Compares where the segment next crosses a row and a column boundary
+        decision = (1 + 2 * i_col) * n_rows - (1 + 2 * i_row) * n_cols
+        corner = None
+        if decision == 0:
+            corner = (
+                (row + step_row) * cols + col,
+                row * cols + col + step_col,
+            )
+            row += step_row
+            col += step_col
+            i_row += 1
+            i_col += 1
+        elif decision < 0:
+            col += step_col
+            i_col += 1
+        else:
+            row += step_row
+            i_row += 1
+        yield row * cols + col, corner
+
+
+def line_of_sight(grid, a, b):
+    # No barrier on the segment, and no squeezing between two diagonal barriers
+    # or past the corner of one (matching 8-way movement without corner cutting)
+    state = grid.state
+    for cell, corner in walk_line(a, b, grid.cols):
+        if state[cell] == BARRIER:
+            return False
+        if corner is not None and (
+            state[corner[0]] == BARRIER or state[corner[1]] == BARRIER
+        ):
+            return False
+    return True
@@ -1,4 +1,4 @@
-import pygame
+from Grid import EMPTY
 
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -10,85 +10,26 @@ PURPLE = (128, 0, 128)
 ORANGE = (255, 165, 0)
 GREY = (128, 128, 128)
 TURQUOISE = (64, 224, 208)
-BUTTON_AREA_HEIGHT = 80
 
+# Colour of each cell state, indexed by the state byte
+COLORS = [WHITE, BLACK, ORANGE, TURQUOISE, GREEN, RED, PURPLE]
 
-class Node:
-    def __init__(self, row, col, width, total_rows):
-        self.row = row
-        self.col = col
-        self.x = col * width
-        self.y = row * width
-        self.color = WHITE
-        self.neighbors = []
-        self.width = width
-        self.total_rows = total_rows
+# Empty cells with a terrain cost are shaded from sand (cost 2) to dark brown
+# (cost 10 and up), indexed by the cost byte
+LIGHT_BROWN = (230, 210, 170)
+DARK_BROWN = (110, 70, 30)
+WEIGHT_COLORS = [WHITE, WHITE] + [
+    tuple(
+        round(light + (dark - light) * min(cost - 2, 8) / 8)
+        for light, dark in zip(LIGHT_BROWN, DARK_BROWN)
+    )
+    for cost in range(2, 256)
+]
 
-    def get_pos(self):
-        return self.row, self.col
 
-    def is_closed(self):
-        return self.color == RED
+def cell_color(grid, index):
+    state = grid.state[index]
+    if state == EMPTY and grid.costs is not None:
+        return WEIGHT_COLORS[grid.costs[index]]
+    return COLORS[state]
 
-    def is_open(self):
-        return self.color == GREEN
-
-    def is_barrier(self):
-        return self.color == BLACK
-
-    def is_start(self):
-        return self.color == ORANGE
-
-    def is_end(self):
-        return self.color == TURQUOISE
-
-    def reset(self):
-        self.color = WHITE
-
-    def make_closed(self):
-        self.color = RED
-
-    def make_open(self):
-        self.color = GREEN
-
-    def make_barrier(self):
-        self.color = BLACK
-
-    def make_start(self):
-        self.color = ORANGE
-
-    def make_end(self):
-        self.color = TURQUOISE
-
-    def make_path(self):
-        self.color = PURPLE
-
-    def draw(self, win):
-        pygame.draw.rect(
-            win,
-            self.color,
-            (self.x, self.y + BUTTON_AREA_HEIGHT, self.width, self.width),
-        )
-
-    def update_neighbors(self, grid):
-        self.neighbors = []
-        if (
-            self.row < self.total_rows - 1
-            and not grid[self.row + 1][self.col].is_barrier()
-        ):  # DOWN
-            self.neighbors.append(grid[self.row + 1][self.col])
-
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():  # UP
-            self.neighbors.append(grid[self.row - 1][self.col])
-
-        if (
-            self.col < self.total_rows - 1
-            and not grid[self.row][self.col + 1].is_barrier()
-        ):  # RIGHT
-            self.neighbors.append(grid[self.row][self.col + 1])
-
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():  # LEFT
-            self.neighbors.append(grid[self.row][self.col - 1])
-
-    def __lt__(self, other):
-        return False
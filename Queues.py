@@ -0,0 +1,110 @@
+from heapq import heappush, heappop
+
+# Priority queues for the best-first searches in Search.py. Both share one
+# interface:
+#   push(item, priority)  insert, or lower the priority of a queued item
+#   pop()                 -> (priority, item) with the smallest priority
+#   item in queue, len(queue)
+# Decrease-key is lazy: pushing a queued item again just adds a new entry and
+# the superseded one is skipped when it reaches the front.
+# BinaryHeap additionally offers peek() and remove(item) for D* Lite.
+
+
+class BinaryHeap:
+    def __init__(self):
+        self.heap = []
+        self.count = 0  # Tie-break so equal priorities pop in FIFO order
+        self.queued = {}  # item -> its live priority
+
+    def push(self, item, priority):
+        self.queued[item] = priority
+        self.count += 1
+        heappush(self.heap, (priority, self.count, item))
+
+    def pop(self):
+        heap = self.heap
+        queued = self.queued
+        while heap:
+            priority, _, item = heappop(heap)
+            if queued.get(item) == priority:
+                del queued[item]
+                return priority, item
+        raise IndexError("pop from an empty priority queue")
+
+    def peek(self):
+        heap = self.heap
+        queued = self.queued
+        while heap:
+            priority, _, item = heap[0]
+            if queued.get(item) == priority:
+                return priority, item
+            heappop(heap)
+        raise IndexError("peek at an empty priority queue")
+
+    def remove(self, item):
+        # The heap entry stays behind and is skipped once it reaches the front
+        self.queued.pop(item, None)
+
+    def __contains__(self, item):
+        return item in self.queued
+
+    def __len__(self):
+        return len(self.queued)
+
+
+class BucketQueue:
+    """
+    Dial's bucket queue for small non-negative integer priorities that never
+    drop below the last popped value (Dijkstra, or A* with a consistent
+    heuristic). Push and pop are O(1) amortised.
+    """
+
+    def __init__(self):
+        self.buckets = []
+        self.current = 0  # No live entry has a lower priority than this
+        self.queued = {}
+
+    def push(self, item, priority):
+        if priority < self.current:
+            raise ValueError("BucketQueue priorities must be monotone")
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        self.queued[item] = priority
+        buckets[priority].append(item)
+
+    def pop(self):
+        buckets = self.buckets
+        queued = self.queued
+        priority = self.current
+        while priority < len(buckets):
+            bucket = buckets[priority]
+            while bucket:
+                item = bucket.pop()
+                if queued.get(item) == priority:
+                    del queued[item]
+                    self.current = priority
+                    return priority, item
+            priority += 1
+        self.current = priority
+        raise IndexError("pop from an empty priority queue")
+
+    def __contains__(self, item):
+        return item in self.queued
+
+    def __len__(self):
+        return len(self.queued)
+
+
+def make_queue(graph):
+    # Integer edge costs and heuristics allow the bucket queue; anything else
+    # (or a graph that doesn't say) gets the binary heap
+    if getattr(graph, "integer_costs", False):
+        return counted(BucketQueue(), graph)
+    return counted(BinaryHeap(), graph)
+
+
+def counted(queue, graph):
+    # Instrumented graphs (Instrumentation.CountingGraph) count queue operations
+    counting_queue = getattr(graph, "counting_queue", None)
+    return queue if counting_queue is None else counting_queue(queue)
@@ -0,0 +1,202 @@
+import time
+from multiprocessing import Process, Queue
+from queue import Empty
+
+import pygame
+
+from Fonts import get_font
+from Grid import OPEN, CLOSED, PATH
+from Movement import graph_for
+from Recording import Recording, Replay
+from Search import SearchObserver
+from SharedGrid import attach, detach, share
+from Strategies import search_for
+
+# Race mode: several searches over one map at once, one worker process each.
+# The grid reaches the workers through shared memory (SharedGrid.py), as in
+# Batch.py. Workers log what they colour in the Recording event format and
+# send the log over a queue a few times a second, with their counters; the UI
+# plays each log into a panel of its own. However slow a search is, it only
+# delays its own panel.
+
+# Seconds between a worker's messages
+FLUSH_INTERVAL = 0.05
+
+# Height of the counter line above each panel, and the gap between panels
+HEADER_HEIGHT = 20
+PANEL_GAP = 4
+
+
+class _Stream(SearchObserver):
+    # Logs a worker's search into a Recording instead of painting a grid
+    def __init__(self, start, end):
+        self.recording = Recording()
+        self.start = start
+        self.end = end
+        self.expanded = 0
+
+    def log(self, cell, state):
+        if cell != self.start and cell != self.end:
+            self.recording.add(cell, state)
+
+    def opened(self, cell):
+        self.log(cell, OPEN)
+
+    def closed(self, cell):
+        self.expanded += 1
+        self.log(cell, CLOSED)
+
+    def path(self, cell):
+        self.log(cell, PATH)
+
+
+def _race(lane, spec, label, movement, start, end, queue):
+    # Worker: runs one search, sending (lane, events, steps, expanded,
+    # seconds, outcome) messages; outcome is None until the last one
+    memory, grid = attach(spec)
+    observer = _Stream(start, end)
+    recording = observer.recording
+    began = flushed = time.perf_counter()
+    sent = 0
+
+    def flush(outcome=None):
+        nonlocal sent
+        events = bytes(recording.events)
+        recording.events.clear()
+        steps = recording.steps - sent
+        sent = recording.steps
+        elapsed = time.perf_counter() - began
+        queue.put((lane, events, steps, observer.expanded, elapsed, outcome))
+
+    try:
+        search = search_for(label, movement)
+        for value in search.steps(graph_for(grid, movement), start, end, observer):
+            if value is not None:
+                result = value
+                continue
+            recording.mark_step()
+            if time.perf_counter() - flushed >= FLUSH_INTERVAL:
+                flushed = time.perf_counter()
+                flush()
+    except Exception as error:
+        flush("failed: {}".format(error))
+    else:
+        flush("cost {:g}".format(result.cost) if result.found else "no path")
+    finally:
+        detach(memory, grid)
+
+
+class Lane:
+    """
+    One racing search as the UI sees it: the grid its log is played into
+    and the counter line drawn above its panel, which the Renderer draws like
+    a widget.
+    """
+
+    def __init__(self, label, grid):
+        self.label = label
+        self.recording = Recording(grid)
+        self.replay = Replay(self.recording)
+        self.grid = self.replay.grid
+        self.expanded = 0
+        self.elapsed = 0.0
+        self.outcome = None
+        self.x = self.y = self.width = 0
+        self.height = HEADER_HEIGHT
+        self.color = (255, 255, 255)
+        self.text = ""
+
+    def receive(self, events, steps, expanded, elapsed, outcome):
+        self.recording.events += events
+        self.recording.steps += steps
+        self.expanded = expanded
+        self.elapsed = elapsed
+        self.outcome = outcome
+        self.text = "{}: {} expanded  {:.2f}s  {}".format(
+            self.label, expanded, elapsed, outcome or "running"
+        )
+
+    def draw(self, win, outline=None):
+        win.fill(self.color, (self.x, self.y, self.width, self.height))
+        font = get_font("calibri", 14)
+        text = font.render(self.text or self.label, 1, (0, 0, 0))
+        top = self.y + (self.height - text.get_height()) // 2
+        win.blit(text, (self.x + 4, top))
+
+
+class Race:
+    """
+    Runs the searches named by `labels` (Strategies.ALGORITHMS keys) on
+    `grid` from `start` to `end`, each in its own process, and plays their
+    progress into one Lane each. Call update() every frame and close() when
+    done; later edits to `grid` are not seen by the race.
+
+    :param movement: Movement model from Movement.MOVEMENTS.
+    """
+
+    def __init__(self, grid, labels, start, end, movement="4-way"):
+        self.lanes = [Lane(label, grid) for label in labels]
+        # The workers search the map without the last run's colouring
+        self.memory, spec = share(grid, self.lanes[0].recording.base)
+        self.queue = Queue()
+        self.workers = []
+        for lane, label in enumerate(labels):
+            worker = Process(
+                target=_race,
+                args=(lane, spec, label, movement, start, end, self.queue),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def layout(self, area):
+        """
+        Splits the window rect `area` into side-by-side panels, placing each
+        lane's counter line, and returns the rects left for the grids.
+        """
+        width = area.width // len(self.lanes)
+        rects = []
+        for i, lane in enumerate(self.lanes):
+            lane.x = area.x + i * width
+            lane.y = area.y
+            lane.width = width - PANEL_GAP
+            rects.append(
+                pygame.Rect(
+                    lane.x,
+                    area.y + HEADER_HEIGHT,
+                    lane.width,
+                    area.height - HEADER_HEIGHT,
+                )
+            )
+        return rects
+
+    def update(self, budget):
+        """
+        Takes in what the workers sent and plays it into the lanes for up to
+        `budget` seconds; what doesn't fit waits for the next frame.
+        """
+        deadline = time.perf_counter() + budget
+        while True:
+            try:
+                lane, *message = self.queue.get_nowait()
+            except Empty:
+                break
+            self.lanes[lane].receive(*message)
+
+        # Round robin, so a lane with a long backlog can't starve the others
+        playing = list(self.lanes)
+        while playing and time.perf_counter() < deadline:
+            for lane in list(playing):
+                for _ in range(100):
+                    if not lane.replay.advance():
+                        playing.remove(lane)
+                        break
+
+    def close(self):
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        self.queue.close()
+        self.memory.close()
+        self.memory.unlink()
@@ -0,0 +1,257 @@
+import os
+import struct
+import zlib
+from bisect import bisect_right
+
+from Grid import Grid, CLEAR_SEARCH, OPEN, CLOSED, PATH, SMALL_COST
+
+# Search runs recorded as compact event logs, for replaying and seeking
+# without running the search again.
+#
+# An event is one varint: the zigzag-encoded difference between its cell and
+# the previous event's cell, shifted left two bits, with the new state in the
+# low bits (0 open, 1 closed, 2 path). Frontiers grow next to the cells just
+# expanded, so most events fit in a byte or two. The value 3 (no cell) ends a
+# search step.
+#
+# Every so often, at a step boundary, the recording keeps a keyframe: the
+# compressed state buffer plus where decoding resumes. Seeking restores the
+# nearest keyframe before the target and replays only the events after it.
+#
+# File layout, all little-endian:
+#   header     magic, format version, rows, cols, largest cost, steps,
+#              keyframe count, compressed base and costs lengths, log length
+#   base       zlib state buffer before the run, search colouring cleared
+#   costs      zlib cost layer, absent (length 0) without terrain
+#   keyframes  (step, offset, cell, length) and that many zlib bytes, each
+#   log        the event bytes
+
+MAGIC = b"PFREC\x00"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<6sHIIIQIQQQ")
+_KEYFRAME = struct.Struct("<QQqQ")
+
+KINDS = (OPEN, CLOSED, PATH)
+KIND_OF = {state: kind for kind, state in enumerate(KINDS)}
+STEP = 3
+
+# Fewest events between keyframes; larger grids space them further apart so
+# snapshot time stays a small share of recording time
+KEYFRAME_EVENTS = 4096
+
+
+class Recording:
+    """
+    Event log of one search run over a grid.
+
+    Made with the grid as it is before the run; PaintObserver calls add()
+    for every cell it colours and record() marks the step boundaries.
+
+    :ivar steps: Steps recorded so far.
+    :ivar keyframes: (step, log offset, previous cell, zlib state) tuples,
+        the first one standing for the base state.
+    """
+
+    def __init__(self, grid=None):
+        self.events = bytearray()
+        self.steps = 0
+        self.last = 0
+        self.keyframes = [(0, 0, 0, None)]
+        self._since_keyframe = 0
+        self.grid = grid
+        if grid is not None:
+            self.rows = grid.rows
+            self.cols = grid.cols
+            # Search colouring is not part of the base
+            self.base = bytes(grid.state).translate(CLEAR_SEARCH)
+            self.costs = None if grid.costs is None else bytes(grid.costs)
+            self.max_cost = grid.max_cost
+            self.interval = max(KEYFRAME_EVENTS, grid.size // 8)
+
+    def add(self, cell, state):
+        delta = cell - self.last
+        self.last = cell
+        zigzag = delta << 1 if delta >= 0 else (-delta << 1) - 1
+        _write_varint(self.events, zigzag << 2 | KIND_OF[state])
+        self._since_keyframe += 1
+
+    def mark_step(self):
+        # Ends a step; keyframes need the grid, so logs made without one
+        # (streamed from Race workers) have none
+        self.events.append(STEP)
+        self.steps += 1
+        if self.grid is not None and self._since_keyframe >= self.interval:
+            self._since_keyframe = 0
+            snapshot = zlib.compress(self.grid.state, 1)
+            self.keyframes.append((self.steps, len(self.events), self.last, snapshot))
+
+    def record(self, steps):
+        """
+        Wraps a step generator, marking each step it yields in the log.
+        """
+        for value in steps:
+            if value is None:
+                self.mark_step()
+            yield value
+
+
+class Replay:
+    """
+    Plays a Recording back into a Grid of its own.
+
+    steps() is a step generator like a search's, one recorded step per
+    iteration, for the Scheduler to run at any speed. seek() jumps to any step
+    from the nearest keyframe.
+    """
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.grid = Grid(recording.rows, recording.cols)
+        if recording.costs is not None:
+            self.grid.costs = bytearray(recording.costs)
+            self.grid.max_cost = recording.max_cost
+            self.grid.integer_costs = recording.max_cost <= SMALL_COST
+        self.restore(recording.keyframes[0])
+
+    def restore(self, keyframe):
+        step, offset, last, snapshot = keyframe
+        if snapshot is None:
+            self.grid.state[:] = self.recording.base
+        else:
+            self.grid.state[:] = zlib.decompress(snapshot)
+        # A bulk rewrite: the renderer repaints everything
+        self.grid.mark_all_changed()
+        self.step = step
+        self.offset = offset
+        self.last = last
+
+    def steps(self):
+        while self.advance():
+            yield
+
+    def advance(self):
+        # Applies the events of the next step; False at the end of the log
+        events = self.recording.events
+        offset = self.offset
+        if offset >= len(events):
+            return False
+        grid = self.grid
+        last = self.last
+        while offset < len(events):
+            value, offset = _read_varint(events, offset)
+            kind = value & 3
+            if kind == STEP:
+                break
+            value >>= 2
+            last += (value >> 1) ^ -(value & 1)
+            grid.set_state(last, KINDS[kind])
+        self.offset = offset
+        self.last = last
+        self.step += 1
+        return True
+
+    def seek(self, step):
+        step = min(max(step, 0), self.recording.steps)
+        keyframes = self.recording.keyframes
+        keyframe = keyframes[bisect_right(keyframes, (step, float("inf"))) - 1]
+        if step < self.step or keyframe[0] > self.step:
+            self.restore(keyframe)
+        while self.step < step and self.advance():
+            pass
+
+
+def save(path, recording):
+    base = zlib.compress(recording.base, 1)
+    costs = b"" if recording.costs is None else zlib.compress(recording.costs, 1)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                recording.rows,
+                recording.cols,
+                recording.max_cost,
+                recording.steps,
+                len(recording.keyframes) - 1,
+                len(base),
+                len(costs),
+                len(recording.events),
+            )
+        )
+        f.write(base)
+        f.write(costs)
+        for step, offset, last, snapshot in recording.keyframes[1:]:
+            f.write(_KEYFRAME.pack(step, offset, last, len(snapshot)))
+            f.write(snapshot)
+        f.write(recording.events)
+    os.replace(temporary, path)
+
+
+def load(path):
+    """
+    Reads a recording written by save().
+
+    :return: A Recording, ready for Replay.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError("{} is not a recording".format(path))
+    header = _HEADER.unpack_from(data)
+    magic, version, rows, cols, max_cost, steps, count = header[:7]
+    base_length, costs_length, events_length = header[7:]
+    if magic != MAGIC:
+        raise ValueError("{} is not a recording".format(path))
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            "{} has format version {}, expected {}".format(
+                path, version, FORMAT_VERSION
+            )
+        )
+
+    recording = Recording()
+    recording.rows = rows
+    recording.cols = cols
+    recording.max_cost = max_cost
+    recording.steps = steps
+    offset = _HEADER.size
+    try:
+        recording.base = zlib.decompress(data[offset : offset + base_length])
+        offset += base_length
+        recording.costs = None
+        if costs_length:
+            recording.costs = zlib.decompress(data[offset : offset + costs_length])
+            offset += costs_length
+    except zlib.error as error:
+        raise ValueError("{} is damaged: {}".format(path, error)) from error
+    for _ in range(count):
+        step, events_offset, last, length = _KEYFRAME.unpack_from(data, offset)
+        offset += _KEYFRAME.size
+        snapshot = data[offset : offset + length]
+        recording.keyframes.append((step, events_offset, last, snapshot))
+        offset += length
+    recording.events = bytearray(data[offset : offset + events_length])
+    if len(recording.base) != rows * cols or len(recording.events) != events_length:
+        raise ValueError("{} is truncated".format(path))
+    return recording
+
+
+def _write_varint(out, value):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
@@ -0,0 +1,337 @@
+import math
+
+import numpy as np
+import pygame
+
+from Grid import EMPTY
+from Node import BLACK, COLORS, GREY, RED, WEIGHT_COLORS, cell_color
+from Viewport import Viewport, MINIMAP_SIZE
+
+WHITE = (255, 255, 255)
+BUTTON_AREA_HEIGHT = 80
+
+# Palette of the one-pixel-per-cell surface: state colours at their state
+# byte, then the terrain shades for cost 2 to 10 (darker costs look the same)
+WEIGHT_BASE = 6
+MAX_SHADE = 10
+PALETTE = (
+    COLORS
+    + [BLACK] * (WEIGHT_BASE + 2 - len(COLORS))
+    + WEIGHT_COLORS[2 : MAX_SHADE + 1]
+)
+PALETTE += [BLACK] * (256 - len(PALETTE))
+
+# Above this fraction of the visible cells changed in a frame, one scaled blit
+# of the view beats filling cells one by one
+BULK_FRACTION = 1 / 16
+
+# Grid lines are drawn from this many pixels per cell up
+LINE_SCALE = 4
+
+
+class GridView:
+    """
+    One grid drawn into one area of the window through a Viewport
+    (`viewport`), so only visible cells are ever painted, and cells off
+    screen are skipped when they change.
+
+    Full repaints, camera moves and frames that change many cells go through
+    an 8-bit surface holding one pixel per visible cell (or per sampled cell,
+    zoomed out), written from the state buffer with `surfarray` and scaled
+    onto the window in a single blit, so they cost about the same at any grid
+    size. While part of the grid is out of view a minimap shows all of it.
+    """
+
+    def __init__(self, win, grid, rect):
+        self.win = win
+        self.viewport = Viewport(rect)
+        self.cells = None  # Palettized surface, reused while its size holds
+        self.grid = grid
+        grid.dirty = set()
+        self.repaints = grid.repaints
+        self.viewport.set_grid(grid)
+
+    def cell_pixels(self, rows, cols):
+        # Palette indices of the cells picked out by the `rows` and `cols`
+        # slices, as a (rows, cols) array
+        grid = self.grid
+        shape = (grid.rows, grid.cols)
+        pixels = np.frombuffer(grid.state, dtype=np.uint8).reshape(shape)[rows, cols]
+        if grid.costs is not None:
+            costs = np.frombuffer(grid.costs, dtype=np.uint8).reshape(shape)
+            costs = costs[rows, cols]
+            weighted = (pixels == EMPTY) & (costs > 1)
+            shade = WEIGHT_BASE + np.minimum(costs, MAX_SHADE)
+            pixels = np.where(weighted, shade, pixels).astype(np.uint8)
+        return pixels
+
+    def palettized(self, pixels):
+        size = (pixels.shape[1], pixels.shape[0])
+        if self.cells is None or self.cells.get_size() != size:
+            self.cells = pygame.Surface(size, depth=8)
+            self.cells.set_palette(PALETTE)
+        pygame.surfarray.blit_array(self.cells, pixels.T)
+        return self.cells
+
+    def paint_grid(self):
+        viewport = self.viewport
+        viewport.changed = False
+        win = self.win
+        win.fill(WHITE, viewport.rect)
+        top, bottom, left, right = viewport.visible()
+        if bottom <= top or right <= left:
+            return viewport.rect
+
+        # Zoomed out, several cells share a pixel; sample one of them
+        step = max(1, int(1 / viewport.scale))
+        pixels = self.cell_pixels(slice(top, bottom, step), slice(left, right, step))
+        x, y = viewport.screen_x(left), viewport.screen_y(top)
+        area = pygame.Rect(
+            x, y, viewport.screen_x(right) - x, viewport.screen_y(bottom) - y
+        )
+        win.set_clip(viewport.rect)
+        win.blit(pygame.transform.scale(self.palettized(pixels), area.size), area)
+        if viewport.scale >= LINE_SCALE:
+            for row in range(top, bottom + 1):
+                y = viewport.screen_y(row)
+                pygame.draw.line(win, GREY, (area.left, y), (area.right, y))
+            for col in range(left, right + 1):
+                x = viewport.screen_x(col)
+                pygame.draw.line(win, GREY, (x, area.top), (x, area.bottom))
+        win.set_clip(None)
+        return viewport.rect
+
+    def paint_cell(self, index):
+        viewport = self.viewport
+        view = viewport.rect
+        rect = viewport.cell_rect(*divmod(index, self.grid.cols))
+        # Cells cut by the view's edge are only painted inside it
+        clipped = rect.clip(view)
+        win = self.win
+        win.fill(cell_color(self.grid, index), clipped)
+        if viewport.scale >= LINE_SCALE:
+            # The lines around the cell (the right and bottom ones are the
+            # neighbours' and get the same colour), each only where it lies
+            # inside the view, as paint_grid draws them
+            outline = pygame.Rect(rect.x, rect.y, rect.width + 1, rect.height + 1)
+            clipped = outline.clip(view)
+            if clipped:
+                left, right = clipped.left, clipped.right - 1
+                top, bottom = clipped.top, clipped.bottom - 1
+                for y in (outline.top, outline.bottom - 1):
+                    if view.top <= y < view.bottom:
+                        pygame.draw.line(win, GREY, (left, y), (right, y))
+                for x in (outline.left, outline.right - 1):
+                    if view.left <= x < view.right:
+                        pygame.draw.line(win, GREY, (x, top), (x, bottom))
+        return clipped
+
+    def restore(self, rect):
+        # Repaints the cells overlapping `rect`; returns the area painted
+        viewport = self.viewport
+        if rect.colliderect(viewport.rect):
+            if viewport.scale < 1:
+                return rect.union(self.paint_grid())
+            top, bottom, left, right = viewport.cells_in(rect)
+            cols = self.grid.cols
+            for row in range(top, bottom):
+                for col in range(left, right):
+                    self.paint_cell(row * cols + col)
+        return rect
+
+    def draw_minimap(self):
+        viewport = self.viewport
+        rect = viewport.minimap_rect
+        grid = self.grid
+        step = max(1, math.ceil(max(grid.rows, grid.cols) / MINIMAP_SIZE))
+        pixels = self.cell_pixels(slice(None, None, step), slice(None, None, step))
+        minimap = pygame.Surface((pixels.shape[1], pixels.shape[0]), depth=8)
+        minimap.set_palette(PALETTE)
+        pygame.surfarray.blit_array(minimap, pixels.T)
+        self.win.blit(pygame.transform.scale(minimap, rect.size), rect)
+        frame = rect.inflate(2, 2)
+        pygame.draw.rect(self.win, GREY, frame, 1)
+        pygame.draw.rect(self.win, RED, viewport.minimap_view(), 1)
+        return frame
+
+    def paint(self, rects, full=False):
+        """
+        Paints what changed since the last call (everything with `full`),
+        appending the rectangles touched to `rects`.
+        """
+        grid = self.grid
+        viewport = self.viewport
+        if grid.repaints != self.repaints:
+            # Bulk rewrite of the grid (maze generation, clearing a run)
+            self.repaints = grid.repaints
+            full = True
+
+        changed = bool(grid.dirty)
+        if full or viewport.changed:
+            rects.append(self.paint_grid())
+            changed = True
+        elif changed:
+            top, bottom, left, right = viewport.visible()
+            cols = grid.cols
+            shown = [
+                index
+                for index in grid.dirty
+                if top <= index // cols < bottom and left <= index % cols < right
+            ]
+            if viewport.scale < 1 and shown:
+                rects.append(self.paint_grid())
+            elif len(shown) > (bottom - top) * (right - left) * BULK_FRACTION:
+                rects.append(self.paint_grid())
+            else:
+                for index in shown:
+                    rects.append(self.paint_cell(index))
+        grid.dirty.clear()
+
+        if viewport.zoomed_in:
+            minimap = viewport.minimap_rect.inflate(2, 2)
+            if changed or any(minimap.colliderect(rect) for rect in rects):
+                rects.append(self.draw_minimap())
+
+
+class Renderer:
+    """
+    Dirty-rectangle renderer for the visualizer window.
+
+    Each frame repaints only the cells the grids report as changed, widgets
+    whose appearance changed and the cursor marker, then updates just those
+    rectangles, so frame cost follows the number of changes rather than the
+    grid size. The area below the button bar shows one grid, or several side
+    by side (set_grids), each through its own GridView.
+    """
+
+    def __init__(self, win, grid):
+        self.win = win
+        width, height = win.get_size()
+        self.grid_area = pygame.Rect(
+            0, BUTTON_AREA_HEIGHT, width, height - BUTTON_AREA_HEIGHT
+        )
+        self.widget_state = {}  # widget -> (appearance, rect last drawn)
+        self.cursor_rect = None
+        self.stats = None  # Instrumentation.Stats timing display updates
+        self.set_grid(grid)
+
+    @property
+    def grid(self):
+        return self.views[0].grid
+
+    @property
+    def viewport(self):
+        return self.views[0].viewport
+
+    def set_grid(self, grid):
+        self.set_grids([grid], [self.grid_area])
+
+    def set_grids(self, grids, rects):
+        """
+        Shows each grid in the matching window rect, in place of what was
+        shown before.
+        """
+        self.views = [
+            GridView(self.win, grid, rect) for grid, rect in zip(grids, rects)
+        ]
+        self.widget_state.clear()
+        self.full_repaint = True
+
+    def restore(self, rect):
+        # Background plus every cell overlapping `rect`
+        rect = rect.clip(self.win.get_rect())
+        self.win.fill(WHITE, rect)
+        for view in self.views:
+            rect = view.restore(rect)
+        return rect
+
+    def render(self, widgets, cursor=None):
+        """
+        Draws one frame.
+
+        :param widgets: Buttons and dropdowns, drawn in order (later on top).
+        :param cursor: Optional (color, rect) marker following the mouse.
+        """
+        win = self.win
+
+        if self.full_repaint:
+            self.full_repaint = False
+            win.fill(WHITE)
+            for view in self.views:
+                view.paint([], full=True)
+            for widget in widgets:
+                self.draw_widget(widget)
+            self.cursor_rect = None
+            self.draw_cursor(cursor)
+            self.update_display()
+            return
+
+        rects = []
+        if self.cursor_rect is not None:
+            rects.append(self.restore(self.cursor_rect))
+            self.cursor_rect = None
+
+        for view in self.views:
+            view.paint(rects)
+
+        for widget in widgets:
+            appearance, old_rect = self.widget_state.get(widget, (None, None))
+            if appearance != widget_appearance(widget):
+                if old_rect is not None:
+                    rects.append(self.restore(old_rect))
+                rects.append(self.draw_widget(widget))
+            elif any(widget_rect(widget).colliderect(rect) for rect in rects):
+                # Repainted cells or a neighbour overlapped it
+                rects.append(self.draw_widget(widget))
+
+        if self.draw_cursor(cursor):
+            rects.append(self.cursor_rect)
+
+        if rects:
+            self.update_display(rects)
+
+    def update_display(self, rects=None):
+        if self.stats is None:
+            pygame.display.update(rects)
+        else:
+            with self.stats.timed("display"):
+                pygame.display.update(rects)
+
+    def draw_widget(self, widget):
+        rect = widget_rect(widget)
+        if hasattr(widget, "options"):
+            widget.draw(self.win)
+        else:
+            widget.draw(self.win, (0, 0, 0))
+        self.widget_state[widget] = (widget_appearance(widget), rect)
+        return rect
+
+    def draw_cursor(self, cursor):
+        if cursor is None:
+            return False
+        color, rect = cursor
+        pygame.draw.rect(self.win, color, rect)
+        self.cursor_rect = pygame.Rect(rect)
+        return True
+
+
+def widget_rect(widget):
+    height = widget.height
+    if getattr(widget, "is_open", False):
+        height *= len(widget.options) + 1
+    # Button outlines extend 2px beyond the button
+    return pygame.Rect(widget.x, widget.y, widget.width, height).inflate(6, 6)
+
+
+def widget_appearance(widget):
+    return (
+        widget.x,
+        widget.y,
+        widget.width,
+        widget.height,
+        widget.color,
+        getattr(widget, "text", None),
+        getattr(widget, "is_open", None),
+        getattr(widget, "hovered_option", None),
+        getattr(widget, "selected_option", None),
+    )
@@ -0,0 +1,177 @@
+from collections import deque
+
+from Queues import BinaryHeap, counted
+from Search import INF, SearchResult, stepwise
+
+# Slack for comparing keys: with sqrt(2) diagonal steps, keys that tie in exact
+# arithmetic can differ in their last bits, and stopping on the wrong side of
+# such a tie leaves a stale g on the path
+EPSILON = 1e-9
+
+
+class DStarLite:
+    """
+    Incremental planner (D* Lite, Koenig & Likhachev) over a Grid. It searches
+    backwards from the end and keeps its g/rhs values between calls to plan(),
+    so after a few barriers change only the affected part of the search is
+    repaired. Changes are read from the grid's edit log; a bulk rewrite of the
+    grid (maze generation) makes the next plan() start from scratch.
+    """
+
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start = start
+        self.end = end
+        # Direction-dependent costs (8-way views) or the terrain cost of the cell
+        # being entered
+        self.step_cost = getattr(grid, "step_cost", None) or self.entry_cost
+        self.reset()
+
+    def reset(self):
+        self.last_start = self.start
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.end: 0}
+        self.queue = counted(BinaryHeap(), self.grid)
+        self.queue.push(self.end, self.key(self.end))
+        self.version = self.grid.version
+        self.observer = None
+        self.expanded = 0
+
+    def entry_cost(self, cell, neighbor):
+        costs = self.grid.costs
+        return 1 if costs is None else costs[neighbor]
+
+    def matches(self, grid, end):
+        # A different start is taken over by move_start()
+        return grid is self.grid and end == self.end
+
+    def move_start(self, start):
+        # The agent moved: shift all keys instead of reordering the queue
+        if start == self.start:
+            return
+        self.km += self.grid.heuristic(self.last_start, start)
+        self.last_start = start
+        self.start = start
+
+    def key(self, cell):
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return best + self.grid.heuristic(self.start, cell) + self.km, best
+
+    def update_vertex(self, cell):
+        grid = self.grid
+        g = self.g
+        if cell != self.end:
+            rhs = INF
+            if not grid.is_barrier(cell):
+                step_cost = self.step_cost
+                for neighbor in grid.neighbors(cell):
+                    rhs = min(rhs, g.get(neighbor, INF) + step_cost(cell, neighbor))
+            if rhs == INF:
+                self.rhs.pop(cell, None)
+            else:
+                self.rhs[cell] = rhs
+        self.queue.remove(cell)
+        if g.get(cell, INF) != self.rhs.get(cell, INF):
+            self.queue.push(cell, self.key(cell))
+            # A cell that just became a barrier is queued only to be invalidated
+            if self.observer is not None and not grid.is_barrier(cell):
+                self.observer.opened(cell)
+
+    def compute_shortest_path(self):
+        queue = self.queue
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        while queue and (
+            key_less(queue.peek()[0], self.key(start))
+            or rhs.get(start, INF) != g.get(start, INF)
+        ):
+            old_key, cell = queue.pop()
+            new_key = self.key(cell)
+            if old_key < new_key:
+                queue.push(cell, new_key)
+            elif g.get(cell, INF) > rhs.get(cell, INF):
+                g[cell] = rhs[cell]
+                self.expanded += 1
+                for neighbor in self.grid.neighbors(cell):
+                    self.update_vertex(neighbor)
+                if self.observer is not None:
+                    self.observer.closed(cell)
+                yield
+            else:
+                g.pop(cell, None)
+                self.expanded += 1
+                self.update_vertex(cell)
+                for neighbor in self.grid.neighbors(cell):
+                    self.update_vertex(neighbor)
+                yield
+
+    def apply_edits(self):
+        edits = self.grid.edits_since(self.version)
+        if edits is None:
+            self.reset()
+            return
+        self.version = self.grid.version
+        # Views whose step rules reach past direct neighbors say which cells an
+        # edit touches (Movement.OctileGrid.around)
+        around = getattr(self.grid, "around", self.grid.neighbors)
+        for cell in set(edits):
+            self.update_vertex(cell)
+            for neighbor in around(cell):
+                self.update_vertex(neighbor)
+
+    def extract_path(self):
+        g = self.g
+        cost = g.get(self.start, INF)
+        if cost == INF:
+            return []
+        path = [self.start]
+        current = self.start
+        step_cost = self.step_cost
+        while current != self.end:
+            current = min(
+                self.grid.neighbors(current),
+                key=lambda n: g.get(n, INF) + step_cost(current, n),
+            )
+            path.append(current)
+        return path
+
+    def plan(self, observer=None):
+        """
+        Brings the plan up to date with the grid and returns a SearchResult
+        whose `expanded` counts only the cells expanded by this call.
+        """
+        return deque(self.plan_steps(observer), maxlen=1)[0]
+
+    def plan_steps(self, observer=None):
+        # Step generator form of plan(), see Search.stepwise
+        self.observer = observer
+        self.expanded = 0
+        self.apply_edits()
+        yield from self.compute_shortest_path()
+        path = self.extract_path()
+        self.observer = None
+
+        cost = self.g.get(self.start) if path else None
+        result = SearchResult(path, cost, self.expanded)
+        if observer is not None:
+            for cell in path:
+                observer.path(cell)
+                yield
+            observer.finished(result)
+        yield result
+
+
+def key_less(a, b):
+    if a[0] < b[0] - EPSILON:
+        return True
+    if a[0] > b[0] + EPSILON:
+        return False
+    return a[1] < b[1] - EPSILON
+
+
+@stepwise
+def d_star_lite(graph, start, end, observer=None):
+    # One-shot use, for callers that treat it like any other search
+    return DStarLite(graph, start, end).plan_steps(observer)
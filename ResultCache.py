@@ -0,0 +1,131 @@
+from collections import OrderedDict
+
+from Movement import euclidean
+from Search import _finish, theta_star
+from Strategies import ALGORITHMS
+
+# Query results kept per grid, least recently used first out. Entries are not
+# dropped when the grid changes; a lookup checks the edits made since the
+# entry was stored (from the grid's edit log) and keeps it if none of them can
+# matter:
+#   - a cell on the path, or beside it for views whose steps depend on nearby
+#     cells (8-way corners, see Movement.OctileGrid.around), changed
+#   - a passable cell off the path changed (it may have been freed or made
+#     cheaper) where a path through it, or through a diagonal step it
+#     unblocks, could beat the stored cost: heuristic(start, cell) +
+#     heuristic(cell, end) is below it for the cell or, on views with
+#     around(), any cell beside it; or anywhere at all when no path was found
+# Anything else (new barriers away from the path) leaves the stored path
+# valid and no worse than any other, so still optimal for optimal searches.
+
+
+class ResultCache:
+    """
+    LRU cache of SearchResults for queries against one grid, keyed by
+    algorithm, connectivity, start and end.
+
+    :param capacity: Most results kept.
+    """
+
+    def __init__(self, grid, capacity=256):
+        self.grid = grid
+        self.capacity = capacity
+        self.entries = OrderedDict()  # Key -> [version, result, path cells]
+        self.hits = 0
+        self.misses = 0
+
+    def matches(self, grid):
+        return grid is self.grid
+
+    def key(self, graph, algorithm, start, end):
+        return algorithm, getattr(graph, "connectivity", 4), start, end
+
+    def get(self, graph, algorithm, start, end):
+        """
+        The stored result for the query if it still holds, else None.
+
+        :param graph: The grid or a movement view of it, whose heuristic and
+            neighborhood decide which edits matter.
+        """
+        key = self.key(graph, algorithm, start, end)
+        entry = self.entries.get(key)
+        if entry is not None and not self.still_valid(
+            graph, algorithm, entry, start, end
+        ):
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, graph, algorithm, start, end, result):
+        key = self.key(graph, algorithm, start, end)
+        self.entries[key] = [self.grid.version, result, set(result.path)]
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def still_valid(self, graph, algorithm, entry, start, end):
+        version, result, cells = entry
+        edits = self.grid.edits_since(version)
+        if edits is None:
+            return False
+        around = getattr(graph, "around", None)
+        heuristic = graph.heuristic
+        if algorithm is theta_star:
+            # Any-angle paths can beat the octile distance, not a straight line
+            cols = self.grid.cols
+            heuristic = lambda a, b: euclidean(a, b, cols)
+        for cell in set(edits):
+            if cell in cells:
+                return False
+            if self.grid.is_barrier(cell):
+                if around is not None and not cells.isdisjoint(around(cell)):
+                    return False
+                continue
+            # Freed or made cheaper, as far as we know. Under the corner rule
+            # that also opens diagonal steps beside it, not only through it.
+            if not result.found:
+                return False
+            near = [cell] if around is None else [cell] + list(around(cell))
+            for other in near:
+                if heuristic(start, other) + heuristic(other, end) < result.cost:
+                    return False
+        # Later lookups only need to look at edits after this one
+        entry[0] = self.grid.version
+        return True
+
+    def search(self, graph, algorithm, start, end):
+        """
+        Runs a query through the cache.
+
+        :param algorithm: A label from Strategies.ALGORITHMS or a search
+            function taking (graph, start, end).
+        """
+        if isinstance(algorithm, str):
+            algorithm = ALGORITHMS[algorithm]
+        result = self.get(graph, algorithm, start, end)
+        if result is None:
+            result = algorithm(graph, start, end)
+            self.put(graph, algorithm, start, end, result)
+        return result
+
+    def steps(self, graph, algorithm, start, end, steps, observer=None):
+        """
+        Step generator form of search() for the Scheduler: a hit replays the
+        stored path into `observer` (reporting nothing expanded), a miss runs
+        `steps` and stores its result if the run completes.
+        """
+        result = self.get(graph, algorithm, start, end)
+        if result is not None:
+            return _finish(graph, observer, result.path, 0, result.cost)
+        return self._storing(graph, algorithm, start, end, steps)
+
+    def _storing(self, graph, algorithm, start, end, steps):
+        for step in steps:
+            if step is not None:
+                self.put(graph, algorithm, start, end, step)
+            yield step
@@ -0,0 +1,78 @@
+import time
+
+import pygame
+
+# Speed dropdown label -> search steps per frame. "Instant" runs as many steps
+# as fit in the frame's search budget, so even it never freezes the window.
+SPEEDS = {"1x": 1, "10x": 10, "100x": 100, "1000x": 1000, "Instant": None}
+
+
+class Scheduler:
+    """
+    Drives a search step generator from the main loop: a fixed number of steps
+    per frame at a target frame rate, so search speed no longer depends on how
+    fast frames can be drawn. The task can be paused, single-stepped and
+    cancelled between frames.
+    """
+
+    def __init__(self, fps=60, search_share=0.75):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.search_budget = search_share / fps  # Seconds per frame for "Instant"
+        self.steps_per_frame = 1
+        self.task = None
+        self.result = None
+        self.paused = False
+
+    @property
+    def running(self):
+        return self.task is not None
+
+    def set_speed(self, label):
+        self.steps_per_frame = SPEEDS[label]
+
+    def start(self, task):
+        self.cancel()
+        self.task = task
+        self.result = None
+        self.paused = False
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.close()
+            self.task = None
+        self.paused = False
+
+    def toggle_pause(self):
+        if self.task is not None:
+            self.paused = not self.paused
+
+    def step(self):
+        self.advance(1)
+
+    def update(self):
+        # Called once per frame
+        if self.task is None or self.paused:
+            return
+        if self.steps_per_frame is None:
+            deadline = time.perf_counter() + self.search_budget
+            while self.task is not None and time.perf_counter() < deadline:
+                self.advance(100)
+        else:
+            self.advance(self.steps_per_frame)
+
+    def advance(self, steps):
+        task = self.task
+        if task is None:
+            return
+        try:
+            for _ in range(steps):
+                value = next(task)
+                if value is not None:
+                    self.result = value
+        except StopIteration:
+            self.task = None
+            self.paused = False
+
+    def tick(self):
+        return self.clock.tick(self.fps)
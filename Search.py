@@ -0,0 +1,612 @@
+from collections import deque
+from functools import wraps
+
+from Grid import BARRIER
+from Movement import OctileGrid, euclidean, line_of_sight, walk_line
+from Queues import make_queue
+
+# The search core is deliberately free of pygame so it can run headless (CI,
+# servers, batch jobs).  A graph is any object exposing:
+#   neighbors(cell)       -> iterable of cells reachable in one step
+#   heuristic(a, b)       -> admissible estimate of the cost from a to b
+# and optionally `integer_costs = True` to let dijkstra/aStar use a bucket queue,
+# and `costs`, a per-cell sequence giving the cost of stepping onto each cell
+# (None or missing means every step costs 1), or `step_cost(a, b)` when a step's
+# cost depends on its direction (diagonal moves, see Movement.py). Only
+# dijkstra, aStar and bidirectional_astar weigh steps; the other searches treat
+# the graph as unweighted.
+# Visualization hooks in through an optional observer (see SearchObserver).
+
+INF = float("inf")
+
+
+class SearchResult:
+    def __init__(self, path, cost, expanded):
+        self.path = path
+        self.cost = cost
+        self.expanded = expanded
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    def __repr__(self):
+        return "SearchResult(found={}, cost={}, expanded={})".format(
+            self.found, self.cost, self.expanded
+        )
+
+
+class SearchObserver:
+    """
+    Receives search events. Subclass and override only what you need.
+
+    opened(cell) fires when a cell joins the frontier, closed(cell) after a cell
+    has been expanded, path(cell) once per cell of the final path (start to end),
+    and finished(result) when the search returns.
+    """
+
+    def opened(self, cell):
+        pass
+
+    def closed(self, cell):
+        pass
+
+    def path(self, cell):
+        pass
+
+    def finished(self, result):
+        pass
+
+
+def reconstruct_path(came_from, current):
+    path = [current]
+    while current in came_from:
+        current = came_from[current]
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def path_cost(graph, path):
+    if not path:
+        return None
+    step_cost = getattr(graph, "step_cost", None)
+    if step_cost is not None:
+        return sum(step_cost(a, b) for a, b in zip(path, path[1:]))
+    costs = getattr(graph, "costs", None)
+    if costs is None:
+        return len(path) - 1
+    return sum(costs[cell] for cell in path[1:])
+
+
+def _finish(graph, observer, path, expanded, cost=None):
+    if cost is None:
+        cost = path_cost(graph, path)
+    result = SearchResult(path, cost, expanded)
+    if observer is not None:
+        for cell in path:
+            observer.path(cell)
+            yield
+        observer.finished(result)
+    yield result
+
+
+def stepwise(steps):
+    """
+    Turns a step generator into a plain search function.
+
+    A step generator yields None after every expansion (and path cell, when
+    observed) and finally yields the SearchResult. The plain function runs it
+    to completion; the generator itself stays available as `search.steps` for
+    callers that drive a search a few steps at a time, like the UI scheduler.
+    """
+
+    @wraps(steps)
+    def search(graph, start, end, observer=None):
+        return deque(steps(graph, start, end, observer), maxlen=1)[0]
+
+    search.steps = steps
+    return search
+
+
+@stepwise
+def dfs(graph, start, end, observer=None):
+    stack = [start]
+    came_from = {}
+    visited = set([start])
+    expanded = 0
+
+    while stack:
+        current = stack.pop()
+
+        if current == end:
+            yield from _finish(
+                graph, observer, reconstruct_path(came_from, end), expanded
+            )
+            return
+
+        expanded += 1
+        for neighbor in graph.neighbors(current):
+            if neighbor not in visited:
+                stack.append(neighbor)
+                visited.add(neighbor)
+                came_from[neighbor] = current
+                if observer is not None:
+                    observer.opened(neighbor)
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+@stepwise
+def bfs(graph, start, end, observer=None):
+    queue = deque([start])
+    came_from = {}
+    visited = set([start])
+    expanded = 0
+
+    while queue:
+        current = queue.popleft()
+
+        if current == end:
+            yield from _finish(
+                graph, observer, reconstruct_path(came_from, end), expanded
+            )
+            return
+
+        expanded += 1
+        for neighbor in graph.neighbors(current):
+            if neighbor not in visited:
+                queue.append(neighbor)
+                visited.add(neighbor)
+                came_from[neighbor] = current
+                if observer is not None:
+                    observer.opened(neighbor)
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+@stepwise
+def bidirectional_search(graph, start, end, observer=None):
+    # Two breadth-first frontiers, one from each end, expanded alternately
+    open_set_forward = deque([start])
+    open_set_backward = deque([end])
+
+    came_from_forward = {}
+    came_from_backward = {}
+
+    visited_forward = {start}
+    visited_backward = {end}
+    expanded = 0
+
+    while open_set_forward and open_set_backward:
+        # Expand the forward search
+        current_forward = open_set_forward.popleft()
+        if current_forward in visited_backward:  # Intersection found
+            path = reconstruct_bidirectional_path(
+                came_from_forward, came_from_backward, current_forward
+            )
+            yield from _finish(graph, observer, path, expanded)
+            return
+        expanded += 1
+        for neighbor in graph.neighbors(current_forward):
+            if neighbor not in visited_forward:
+                came_from_forward[neighbor] = current_forward
+                open_set_forward.append(neighbor)
+                visited_forward.add(neighbor)
+                if observer is not None:
+                    observer.opened(neighbor)
+        if observer is not None:
+            observer.closed(current_forward)
+        yield
+
+        # Expand the backward search
+        current_backward = open_set_backward.popleft()
+        if current_backward in visited_forward:  # Intersection found
+            path = reconstruct_bidirectional_path(
+                came_from_forward, came_from_backward, current_backward
+            )
+            yield from _finish(graph, observer, path, expanded)
+            return
+        expanded += 1
+        for neighbor in graph.neighbors(current_backward):
+            if neighbor not in visited_backward:
+                came_from_backward[neighbor] = current_backward
+                open_set_backward.append(neighbor)
+                visited_backward.add(neighbor)
+                if observer is not None:
+                    observer.opened(neighbor)
+        if observer is not None:
+            observer.closed(current_backward)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+def reconstruct_bidirectional_path(came_from_forward, came_from_backward, intersection):
+    # From the start to the intersection...
+    path = reconstruct_path(came_from_forward, intersection)
+
+    # ...then on from the intersection to the end
+    current = intersection
+    while current in came_from_backward:
+        current = came_from_backward[current]
+        path.append(current)
+    return path
+
+
+@stepwise
+def bidirectional_astar(graph, start, end, observer=None):
+    """
+    NBA* (Pijls and Post): A* from both ends at once, expanding the side with
+    the smaller frontier. `best` is the cheapest start-to-end path seen where
+    the two searches touch. A popped cell is closed for both sides, and only
+    expanded if a path through it could still beat `best`:
+      - its own f = g + h towards the far end is below `best`, and
+      - g + (lowest f on the other side) - h towards this side's own end is
+        below `best`, the other side's view of the same bound.
+    Once the lowest f on either side reaches `best` nothing left can improve
+    on it, so the path is optimal. The graph must be symmetric (every edge
+    usable both ways, as on every grid view here); the backward search prices
+    the step from a cell to its neighbor as the forward step into the cell.
+    """
+    heuristic = graph.heuristic
+    costs = getattr(graph, "costs", None)
+    step_cost = getattr(graph, "step_cost", None)
+    # Per side: queue, g scores, came_from, target, lowest f popped so far
+    sides = []
+    for source, target in ((start, end), (end, start)):
+        open_set = make_queue(graph)
+        open_set.push(source, heuristic(source, target))
+        sides.append([open_set, {source: 0}, {}, target, heuristic(start, end)])
+    forward = sides[0]
+    closed = set()
+    best, meeting = (0, start) if start == end else (INF, None)
+    expanded = 0
+
+    while sides[0][0] and sides[1][0]:
+        side, other = sides if len(sides[0][0]) <= len(sides[1][0]) else sides[::-1]
+        open_set, g_score, came_from, target, _ = side
+        f_score, current = open_set.pop()
+        if f_score >= best:
+            break  # Every cell left on this side is at least as dear
+        side[4] = f_score
+        if current in closed:
+            continue
+        closed.add(current)
+        current_g_score = g_score[current]
+        if current_g_score + other[4] - heuristic(current, other[3]) < best:
+            expanded += 1
+            other_g_score = other[1]
+            for neighbor in graph.neighbors(current):
+                if neighbor in closed:
+                    continue
+                if side is forward:
+                    a, b = current, neighbor
+                else:
+                    a, b = neighbor, current
+                if step_cost is not None:
+                    temp_g_score = current_g_score + step_cost(a, b)
+                elif costs is None:
+                    temp_g_score = current_g_score + 1
+                else:
+                    temp_g_score = current_g_score + costs[b]
+                if temp_g_score < g_score.get(neighbor, INF):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    if observer is not None and neighbor not in open_set:
+                        observer.opened(neighbor)
+                    open_set.push(neighbor, temp_g_score + heuristic(neighbor, target))
+                    total = temp_g_score + other_g_score.get(neighbor, INF)
+                    if total < best:
+                        best = total
+                        meeting = neighbor
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    if meeting is None:
+        path = []
+    else:
+        path = reconstruct_bidirectional_path(forward[2], sides[1][2], meeting)
+    yield from _finish(graph, observer, path, expanded)
+
+
+@stepwise
+def dijkstra(graph, start, end, observer=None):
+    open_set = make_queue(graph)
+    open_set.push(start, 0)
+    came_from = {}
+    g_score = {start: 0}  # Only touched cells get an entry
+    costs = getattr(graph, "costs", None)
+    step_cost = getattr(graph, "step_cost", None)
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()[1]
+
+        if current == end:
+            yield from _finish(
+                graph, observer, reconstruct_path(came_from, end), expanded
+            )
+            return
+
+        expanded += 1
+        current_g_score = g_score[current]
+        for neighbor in graph.neighbors(current):
+            if step_cost is not None:
+                temp_g_score = current_g_score + step_cost(current, neighbor)
+            elif costs is None:
+                temp_g_score = current_g_score + 1
+            else:
+                temp_g_score = current_g_score + costs[neighbor]
+            if temp_g_score < g_score.get(neighbor, INF):
+                came_from[neighbor] = current
+                g_score[neighbor] = temp_g_score
+                if observer is not None and neighbor not in open_set:
+                    observer.opened(neighbor)
+                # Re-pushing a queued neighbor lowers its key
+                open_set.push(neighbor, temp_g_score)
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+@stepwise
+def aStar(graph, start, end, observer=None):
+    open_set = make_queue(graph)
+    open_set.push(start, graph.heuristic(start, end))
+    came_from = {}
+    g_score = {start: 0}  # Only touched cells get an entry
+    costs = getattr(graph, "costs", None)
+    step_cost = getattr(graph, "step_cost", None)
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()[1]
+
+        if current == end:
+            yield from _finish(
+                graph, observer, reconstruct_path(came_from, end), expanded
+            )
+            return
+
+        expanded += 1
+        current_g_score = g_score[current]
+        for neighbor in graph.neighbors(current):
+            if step_cost is not None:
+                temp_g_score = current_g_score + step_cost(current, neighbor)
+            elif costs is None:
+                temp_g_score = current_g_score + 1
+            else:
+                temp_g_score = current_g_score + costs[neighbor]
+            if temp_g_score < g_score.get(neighbor, INF):
+                came_from[neighbor] = current
+                g_score[neighbor] = temp_g_score
+                if observer is not None and neighbor not in open_set:
+                    observer.opened(neighbor)
+                # Re-pushing a queued neighbor lowers its key
+                open_set.push(neighbor, temp_g_score + graph.heuristic(neighbor, end))
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+@stepwise
+def jump_point_search(grid, start, end, observer=None):
+    """
+    Jump Point Search for uniform-cost 4-connected grids. Only works on a Grid
+    (it scans rows and columns of the state buffer directly); returns the same
+    path costs as aStar while expanding only jump points. Grids with terrain
+    costs or diagonal moves are handed to aStar, since these jumps assume
+    uniform 4-connected steps.
+    """
+    if grid.costs is not None or grid.connectivity != 4:
+        yield from aStar.steps(grid, start, end, observer)
+        return
+
+    state = grid.state
+    rows = grid.rows
+    cols = grid.cols
+
+    def jump_horizontal(row, col, dc):
+        # Scan along a row from (row, col); the cell behind (col - dc) is open
+        if not 0 <= col < cols:
+            return None
+        index = row * cols + col
+        stop = row * cols + (cols if dc > 0 else -1)
+        has_up = row > 0
+        has_down = row < rows - 1
+        while index != stop and state[index] != BARRIER:
+            if index == end:
+                return index
+            # Forced neighbor: an open cell above/below whose approach is blocked
+            if (
+                has_up
+                and state[index - cols] != BARRIER
+                and state[index - cols - dc] == BARRIER
+            ) or (
+                has_down
+                and state[index + cols] != BARRIER
+                and state[index + cols - dc] == BARRIER
+            ):
+                return index
+            index += dc
+        return None
+
+    def jump_vertical(row, col, dr):
+        step = dr * cols
+        has_left = col > 0
+        has_right = col < cols - 1
+        index = row * cols + col
+        while 0 <= row < rows and state[index] != BARRIER:
+            if index == end:
+                return index
+            if (
+                has_left
+                and state[index - 1] != BARRIER
+                and state[index - step - 1] == BARRIER
+            ) or (
+                has_right
+                and state[index + 1] != BARRIER
+                and state[index - step + 1] == BARRIER
+            ):
+                return index
+            # Vertical moves stop wherever a horizontal scan finds a jump point
+            if (
+                jump_horizontal(row, col + 1, 1) is not None
+                or jump_horizontal(row, col - 1, -1) is not None
+            ):
+                return index
+            row += dr
+            index += step
+        return None
+
+    def successors(current):
+        row, col = divmod(current, cols)
+        parent = came_from.get(current)
+        if parent is None:
+            directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        else:
+            parent_row, parent_col = divmod(parent, cols)
+            dr = (row > parent_row) - (row < parent_row)
+            dc = (col > parent_col) - (col < parent_col)
+            if dc:
+                directions = ((1, 0), (-1, 0), (0, dc))
+            else:
+                directions = ((0, 1), (0, -1), (dr, 0))
+        for dr, dc in directions:
+            if dc:
+                point = jump_horizontal(row, col + dc, dc)
+            else:
+                point = jump_vertical(row + dr, col, dr)
+            if point is not None:
+                yield point
+
+    open_set = make_queue(grid)
+    open_set.push(start, grid.heuristic(start, end))
+    came_from = {}
+    g_score = {start: 0}
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()[1]
+
+        if current == end:
+            path = _expand_jumps(reconstruct_path(came_from, end), cols)
+            yield from _finish(grid, observer, path, expanded)
+            return
+
+        expanded += 1
+        for point in successors(current):
+            temp_g_score = g_score[current] + grid.heuristic(current, point)
+            if temp_g_score < g_score.get(point, INF):
+                came_from[point] = current
+                g_score[point] = temp_g_score
+                if observer is not None and point not in open_set:
+                    observer.opened(point)
+                open_set.push(point, temp_g_score + grid.heuristic(point, end))
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(grid, observer, [], expanded)
+
+
+def _expand_jumps(jump_points, cols):
+    # Fill in the straight runs between consecutive jump points
+    path = jump_points[:1]
+    for target in jump_points[1:]:
+        current = path[-1]
+        step = cols if abs(target - current) >= cols else 1
+        if target < current:
+            step = -step
+        while current != target:
+            current += step
+            path.append(current)
+    return path
+
+
+@stepwise
+def theta_star(grid, start, end, observer=None):
+    """
+    Theta* (Nash et al.): any-angle A* over the 8-connected cells of a Grid. A
+    cell's parent may be any cell it can see, not just a neighbor, so paths
+    run in straight lines between barrier corners instead of along the grid.
+    Costs are Euclidean lengths; the path is reported as the cells the
+    segments pass through. Grids with terrain costs are handed to aStar over
+    8-connected moves.
+    """
+    graph = grid if grid.connectivity == 8 else OctileGrid(grid)
+    if graph.costs is not None:
+        yield from aStar.steps(graph, start, end, observer)
+        return
+
+    cols = graph.cols
+    open_set = make_queue(graph)
+    open_set.push(start, euclidean(start, end, cols))
+    parent = {}  # The start is its own parent, see below
+    g_score = {start: 0}
+    closed = set()
+    expanded = 0
+
+    while open_set:
+        current = open_set.pop()[1]
+
+        if current == end:
+            waypoints = reconstruct_path(parent, end)
+            yield from _finish(
+                graph,
+                observer,
+                _trace_segments(waypoints, cols),
+                expanded,
+                g_score[end],
+            )
+            return
+
+        expanded += 1
+        closed.add(current)
+        current_parent = parent.get(current, current)
+        for neighbor in graph.neighbors(current):
+            if neighbor in closed:
+                continue
+            # Path 2: straight from the parent if it can see the neighbor
+            if line_of_sight(graph, current_parent, neighbor):
+                source = current_parent
+            else:
+                source = current
+            temp_g_score = g_score[source] + euclidean(source, neighbor, cols)
+            if temp_g_score < g_score.get(neighbor, INF):
+                parent[neighbor] = source
+                g_score[neighbor] = temp_g_score
+                if observer is not None and neighbor not in open_set:
+                    observer.opened(neighbor)
+                open_set.push(neighbor, temp_g_score + euclidean(neighbor, end, cols))
+
+        if observer is not None:
+            observer.closed(current)
+        yield
+
+    yield from _finish(graph, observer, [], expanded)
+
+
+def _trace_segments(waypoints, cols):
+    # The cells each straight segment between consecutive waypoints crosses
+    path = waypoints[:1]
+    for a, b in zip(waypoints, waypoints[1:]):
+        path.extend(cell for cell, _ in walk_line(a, b, cols))
+    return path
@@ -0,0 +1,54 @@
+from multiprocessing import shared_memory
+
+from Grid import Grid, SMALL_COST
+
+# Grids handed to worker processes (Batch, Race) through shared memory. The
+# owner copies the state buffer, and the cost layer after it when there is
+# terrain, into one block once; every worker wraps the block in a Grid of its
+# own, so no task ever pickles a grid. Later edits to the owner's grid are
+# not seen by the workers.
+
+
+def share(grid, state=None):
+    """
+    Copies `grid` into a new shared memory block.
+
+    :param state: Buffer to share in place of `grid.state` (e.g. with search
+        colouring cleared).
+    :return: The SharedMemory, which the caller closes and unlinks when the
+        workers are done, and a picklable spec for attach().
+    """
+    size = grid.size
+    max_cost = grid.max_cost if grid.costs is not None else 1
+    memory = shared_memory.SharedMemory(
+        create=True, size=size * (2 if max_cost > 1 else 1)
+    )
+    memory.buf[:size] = grid.state if state is None else state
+    if max_cost > 1:
+        memory.buf[size : 2 * size] = grid.costs
+    return memory, (memory.name, grid.rows, grid.cols, max_cost)
+
+
+def attach(spec):
+    """
+    Opens a block made by share() in a worker.
+
+    :return: The SharedMemory and a Grid viewing it.
+    """
+    name, rows, cols, max_cost = spec
+    memory = shared_memory.SharedMemory(name=name)
+    size = rows * cols
+    grid = Grid(rows, cols, state=memory.buf[:size])
+    if max_cost > 1:
+        grid.costs = memory.buf[size : 2 * size]
+        grid.max_cost = max_cost
+        grid.integer_costs = max_cost <= SMALL_COST
+    return memory, grid
+
+
+def detach(memory, grid):
+    # The block can't be closed while the grid still views it
+    grid.state.release()
+    if grid.costs is not None:
+        grid.costs.release()
+    memory.close()
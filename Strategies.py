@@ -0,0 +1,29 @@
+import Search
+from Hierarchy import hpa_star
+from Replanner import d_star_lite
+
+# Dropdown label -> search function, shared by the UI and headless callers.
+# Every entry takes (graph, start, end, observer=None) and returns a
+# SearchResult.
+ALGORITHMS = {
+    "A* Search": Search.aStar,
+    "Dijkstra": Search.dijkstra,
+    "BFS": Search.bfs,
+    "DFS": Search.dfs,
+    "Bidirectional Search": Search.bidirectional_search,
+    "Bidirectional A*": Search.bidirectional_astar,
+    "Jump Point Search": Search.jump_point_search,
+    "D* Lite": d_star_lite,
+    "HPA*": hpa_star,
+}
+
+
+def search_for(label, movement="4-way"):
+    """
+    The search function to run for a dropdown label under a movement model
+    from Movement.MOVEMENTS. Any-angle movement is what Theta* does, so it
+    replaces the chosen label; 4-way and 8-way keep it.
+    """
+    if movement == "Any-angle":
+        return Search.theta_star
+    return ALGORITHMS[label]
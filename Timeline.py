@@ -0,0 +1,67 @@
+import pygame
+
+from Fonts import get_font
+
+WHITE = (255, 255, 255)
+GREY = (128, 128, 128)
+LIGHT_GREY = (220, 220, 220)
+BLUE = (0, 0, 255)
+BLACK = (0, 0, 0)
+
+LABEL_WIDTH = 120
+
+
+class Timeline:
+    """
+    Scrubber for a Recording.Replay, drawn by the Renderer like a widget:
+    a track filled up to the current step, and "step / steps" beside it.
+    Clicking or dragging on the track picks the step to seek to.
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = WHITE
+        self.text = ""
+        self.step = 0
+        self.steps = 0
+
+    @property
+    def track(self):
+        third = self.height // 3
+        return pygame.Rect(self.x, self.y + third, self.width - LABEL_WIDTH, third)
+
+    def update(self, replay):
+        self.step = replay.step
+        self.steps = replay.recording.steps
+        # The label changes with every step, which tells the Renderer to redraw
+        self.text = "{} / {}".format(self.step, self.steps)
+
+    def is_over(self, pos):
+        return (
+            self.x <= pos[0] < self.x + self.width - LABEL_WIDTH
+            and self.y <= pos[1] < self.y + self.height
+        )
+
+    def step_at(self, pos):
+        track = self.track
+        fraction = min(max((pos[0] - track.x) / track.width, 0), 1)
+        return round(fraction * self.steps)
+
+    def draw(self, win, outline=None):
+        win.fill(self.color, (self.x, self.y, self.width, self.height))
+        track = self.track
+        pygame.draw.rect(win, LIGHT_GREY, track)
+        if self.steps:
+            done = round(track.width * self.step / self.steps)
+            pygame.draw.rect(win, BLUE, (track.x, track.y, done, track.height))
+            handle = pygame.Rect(0, self.y, 6, self.height)
+            handle.centerx = track.x + done
+            pygame.draw.rect(win, BLACK, handle)
+        pygame.draw.rect(win, GREY, track, 1)
+        # Rendered directly: a new label every step would churn the text cache
+        text = get_font("calibri", 14).render(self.text, 1, BLACK)
+        top = self.y + (self.height - text.get_height()) // 2
+        win.blit(text, (track.right + 10, top))
@@ -0,0 +1,194 @@
+import math
+
+import pygame
+
+# Largest zoom, in pixels per cell
+MAX_SCALE = 64
+ZOOM_STEP = 1.25
+
+# Longest side of the minimap, in pixels, and its gap to the view's corner
+MINIMAP_SIZE = 160
+MINIMAP_MARGIN = 10
+
+
+class Viewport:
+    """
+    Camera over a grid: which cells are on screen and how large they are.
+
+    `rect` is the window area the grid is drawn into. The camera keeps the
+    cell coordinates (x, y) of the view's top-left corner and a scale in
+    pixels per cell, below 1 when zoomed out past one pixel per cell. Drawing
+    and hit-testing go through it so they only ever touch the visible cells.
+    `changed` is set whenever the camera moves, for the renderer to repaint.
+    """
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.rows = self.cols = 1
+        self.x = self.y = 0.0
+        self.scale = self.min_scale = 1.0
+        self.changed = True
+
+    def set_grid(self, grid):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        # Whole grid in view, at whole pixels per cell when they fit
+        scale = min(self.rect.width / self.cols, self.rect.height / self.rows)
+        self.min_scale = math.floor(scale) if scale >= 1 else scale
+        self.fit()
+
+    def fit(self):
+        self.scale = self.min_scale
+        self.x = self.y = 0.0
+        self.clamp()
+
+    def zoom(self, steps, pos):
+        """
+        Zooms in (positive `steps`) or out, keeping the cell under the screen
+        point `pos` where it is.
+        """
+        scale = self.scale * ZOOM_STEP**steps
+        if scale >= 1:
+            # Whole pixels per cell, so cells keep an even size
+            scale = round(scale)
+            if scale == self.scale:
+                scale += 1 if steps > 0 else -1
+        scale = min(max(scale, self.min_scale), max(MAX_SCALE, self.min_scale))
+        dx = pos[0] - self.rect.x
+        dy = pos[1] - self.rect.y
+        col = self.x + dx / self.scale
+        row = self.y + dy / self.scale
+        self.scale = scale
+        self.x = col - dx / scale
+        self.y = row - dy / scale
+        self.clamp()
+
+    def pan(self, dx, dy):
+        # Drags the grid by (dx, dy) pixels
+        self.x -= dx / self.scale
+        self.y -= dy / self.scale
+        self.clamp()
+
+    def center_on(self, row, col):
+        self.x = col - self.rect.width / self.scale / 2
+        self.y = row - self.rect.height / self.scale / 2
+        self.clamp()
+
+    def clamp(self):
+        # A grid smaller than the view sits in its top-left corner; a larger
+        # one can't be dragged off screen
+        width = self.rect.width / self.scale
+        height = self.rect.height / self.scale
+        self.x = min(max(self.x, 0), max(self.cols - width, 0))
+        self.y = min(max(self.y, 0), max(self.rows - height, 0))
+        self.changed = True
+
+    # Cell edges map to whole pixels through screen_x/screen_y alone; col_at
+    # and row_at invert them exactly, so a point always hits the cell whose
+    # cell_rect contains it
+
+    def screen_x(self, col):
+        return self.rect.x + math.floor((col - self.x) * self.scale)
+
+    def screen_y(self, row):
+        return self.rect.y + math.floor((row - self.y) * self.scale)
+
+    def col_at(self, x):
+        # The last column whose left edge is at or before pixel column x
+        col = math.floor(self.x + (x - self.rect.x) / self.scale)
+        while self.screen_x(col) > x:
+            col -= 1
+        while self.screen_x(col + 1) <= x:
+            col += 1
+        return col
+
+    def row_at(self, y):
+        row = math.floor(self.y + (y - self.rect.y) / self.scale)
+        while self.screen_y(row) > y:
+            row -= 1
+        while self.screen_y(row + 1) <= y:
+            row += 1
+        return row
+
+    def visible(self):
+        # (top, bottom, left, right) rows and columns in view, bottom and
+        # right exclusive
+        return (
+            max(math.floor(self.y), 0),
+            min(math.ceil(self.y + self.rect.height / self.scale), self.rows),
+            max(math.floor(self.x), 0),
+            min(math.ceil(self.x + self.rect.width / self.scale), self.cols),
+        )
+
+    def cells_in(self, rect):
+        # Like visible(), for the cells overlapping a screen rect
+        rect = rect.clip(self.rect)
+        if not rect:
+            return 0, 0, 0, 0
+        return (
+            max(self.row_at(rect.top), 0),
+            min(self.row_at(rect.bottom - 1) + 1, self.rows),
+            max(self.col_at(rect.left), 0),
+            min(self.col_at(rect.right - 1) + 1, self.cols),
+        )
+
+    def cell_rect(self, row, col):
+        left = self.screen_x(col)
+        top = self.screen_y(row)
+        return pygame.Rect(
+            left, top, self.screen_x(col + 1) - left, self.screen_y(row + 1) - top
+        )
+
+    def cell_at(self, pos):
+        # Index of the cell under a screen point, None off the grid
+        if not self.rect.collidepoint(pos):
+            return None
+        col = self.col_at(pos[0])
+        row = self.row_at(pos[1])
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row * self.cols + col
+        return None
+
+    @property
+    def zoomed_in(self):
+        # Part of the grid is out of view
+        return (
+            self.cols * self.scale > self.rect.width + 1
+            or self.rows * self.scale > self.rect.height + 1
+        )
+
+    @property
+    def minimap_rect(self):
+        scale = MINIMAP_SIZE / max(self.rows, self.cols)
+        width = max(round(self.cols * scale), 1)
+        height = max(round(self.rows * scale), 1)
+        return pygame.Rect(
+            self.rect.right - MINIMAP_MARGIN - width,
+            self.rect.bottom - MINIMAP_MARGIN - height,
+            width,
+            height,
+        )
+
+    def minimap_view(self):
+        # The part of the minimap showing what is on screen
+        minimap = self.minimap_rect
+        x_scale = minimap.width / self.cols
+        y_scale = minimap.height / self.rows
+        return pygame.Rect(
+            minimap.x + math.floor(self.x * x_scale),
+            minimap.y + math.floor(self.y * y_scale),
+            max(math.ceil(self.rect.width / self.scale * x_scale), 1),
+            max(math.ceil(self.rect.height / self.scale * y_scale), 1),
+        ).clip(minimap)
+
+    def minimap_at(self, pos):
+        """
+        (row, col) of the grid under a point on the minimap, or None when the
+        minimap is hidden or `pos` is off it.
+        """
+        minimap = self.minimap_rect
+        if not self.zoomed_in or not minimap.collidepoint(pos):
+            return None
+        row = (pos[1] - minimap.y) * self.rows // minimap.height
+        col = (pos[0] - minimap.x) * self.cols // minimap.width
+        return row, col
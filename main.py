@@ -1,22 +1,22 @@
+import argparse
+import os
+import time
 import pygame
-import math
-import random
 from Button import Button
-from Node import Node
 from Dropdown import Dropdown
-from Grid import Grid
-from Algorithms import (
-    reconstruct_path,
-    h,
-    dfs,
-    bfs,
-    bidirectional_search,
-    reconstruct_bidirectional_path,
-    dijkstra,
-    aStar,
-)
-
-from queue import PriorityQueue
+from Renderer import Renderer
+from Grid import Grid, BARRIER, START, END
+import Maze
+from Algorithms import search_steps, hierarchy_for, use_hierarchy
+from Scheduler import Scheduler, SPEEDS
+from Movement import MOVEMENTS
+from Instrumentation import Stats, Overlay, profile_call
+import MapFile
+import Recording
+from Race import Race
+from Strategies import ALGORITHMS
+from Timeline import Timeline
+
 from collections import deque
 
 pygame.init()
@@ -24,8 +24,6 @@ pygame.font.init()
 
 WIDTH = 1000
 HEIGHT = 860
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Path Finding Algorithm Visualizer")
 BUTTON_AREA_HEIGHT = 80
 
 
@@ -43,64 +41,23 @@ DARK_GREY = (200, 200, 200)
 LIGHT_GREEN = (0, 150, 0)
 LIGHT_WHITE = (200, 200, 200)
 LIGHT_RED = (255, 102, 102)
+BROWN = (160, 110, 60)
+LIGHT_BROWN = (200, 160, 110)
 
-font = pygame.font.SysFont("calibri", 16)
-
+# Step costs the Weight button cycles through; 1 erases terrain
+WEIGHTS = [2, 5, 10, 1]
 
 # +60 to adjust for the buttons
 
 
-def draw(
-    win,
-    grid,
-    grid_obj,
-    rows,
-    width,
-    start_button,
-    end_button,
-    barrier_button,
-    start_algo_button,
-    reset_button,
-    maze_button,
-    algorithm_dropdown,
-    mouse_pos,
-    mode,
-):
-    win.fill(WHITE)
-
-    for row in grid:
-        for node in row:
-            node.draw(win)
-
-    grid_obj.draw_grid(win)
-
-    # Draw the buttons after filling the window and drawing the grid
-    start_button.draw(win, (0, 0, 0))
-    end_button.draw(win, (0, 0, 0))
-    barrier_button.draw(win, (0, 0, 0))
-    start_algo_button.draw(win, (0, 0, 0))
-    reset_button.draw(win, (0, 0, 0))
-    algorithm_dropdown.draw(win)
-    maze_button.draw(win, (0, 0, 0))
-
+def draw(renderer, widgets, mouse_pos, mode):
+    cursor = None
     color = get_color_from_mode(mode)
     if color and mouse_pos[1] > BUTTON_AREA_HEIGHT:
-        pygame.draw.rect(win, color, (mouse_pos[0] - 5, mouse_pos[1] - 5, 10, 10))
-
-    pygame.display.update()
-
-
-def get_clicked_pos(pos, rows, width):
-    gap = width // rows
-    x, y = pos
-
-    col = x // gap
-    row = (y - BUTTON_AREA_HEIGHT) // gap  # Adjust the y position here
-
-    # Ensure row is within valid range
-    row = min(max(row, 0), rows - 1)
+        cursor = (color, (mouse_pos[0] - 5, mouse_pos[1] - 5, 10, 10))
 
-    return row, col
+    # Only cells, widgets and cursor that changed since the last frame are drawn
+    renderer.render(widgets, cursor)
 
 
 def get_color_from_mode(mode):
@@ -110,57 +67,135 @@ def get_color_from_mode(mode):
         return TURQUOISE
     elif mode == "barrier":
         return BLACK
+    elif mode == "weight":
+        return BROWN
     else:
         return None
 
 
-def generate_random_maze(grid, barrier_probability=0.3):
-    """
-    Fills the grid with barriers based on the given probability.
-
-    :param grid: The grid of nodes.
-    :param barrier_probability: Probability of a node being a barrier.
-    """
-    # First, clear the grid except for start and end nodes
-    for row in grid:
-        for node in row:
-            if (
-                not node.is_start() and not node.is_end()
-            ):  # Assuming you have methods like these in your node class
-                node.reset()  # Assuming you have a reset method in your node class that sets the node back to its default state
-
-    # Now, generate the random barriers
-    for row in grid:
-        for node in row:
-            if (
-                not node.is_start()
-                and not node.is_end()
-                and random.random() < barrier_probability
-            ):
-                node.make_barrier()
-
-
-def main(win, width):
-    ROWS = 50
-    grid_obj = Grid(ROWS, width)
-    grid = grid_obj.grid
+def find_ends(grid):
+    # A loaded map or replay stores its start and end as cell states
+    cells = bytes(grid.state)
+    start = cells.find(START)
+    end = cells.find(END)
+    return (start if start >= 0 else None), (end if end >= 0 else None)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Path finding algorithm visualizer")
+    parser.add_argument(
+        "--stats", action="store_true", help="show live statistics (toggle with I)"
+    )
+    parser.add_argument(
+        "--trace", metavar="DIR", help="write a Chrome trace of every run to DIR"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        help="run each search unanimated under a profiler and save its report",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=50, help="rows and columns of a new grid"
+    )
+    parser.add_argument(
+        "--map",
+        default="grid.map",
+        help="map file saved with S and loaded with L (default grid.map)",
+    )
+    parser.add_argument(
+        "--recording",
+        default="run.rec",
+        help="recording of the last run, saved with W and opened with O "
+        "(default run.rec)",
+    )
+    parser.add_argument(
+        "--race",
+        nargs="+",
+        choices=list(ALGORITHMS),
+        default=["A* Search", "Dijkstra", "BFS"],
+        help="algorithms C races side by side (default A*, Dijkstra and BFS)",
+    )
+    return parser.parse_args()
+
+
+def main(win, options):
+    ROWS = options.rows
+    grid_obj = Grid(ROWS)
     start = None
     end = None
     run = True
-    started = False
     algorithm_ran = False
 
     # Create button instances
-    start_button = Button(ORANGE, 10, 10, 100, 50, "Start Node", YELLOW)
-    end_button = Button(TURQUOISE, 120, 10, 100, 50, "End Node", BLUE)
-    barrier_button = Button(GREY, 230, 10, 100, 50, "Barrier", LIGHT_WHITE)
-    start_algo_button = Button(GREEN, 340, 10, 150, 50, "Start Algorithm", LIGHT_GREEN)
-    reset_button = Button(WHITE, 500, 10, 100, 50, "Reset", LIGHT_WHITE)
-    maze_button = Button(LIGHT_RED, 830, 10, 150, 50, "Generate Maze", RED)
+    start_button = Button(ORANGE, 10, 10, 80, 50, "Start Node", YELLOW)
+    end_button = Button(TURQUOISE, 95, 10, 75, 50, "End Node", BLUE)
+    barrier_button = Button(GREY, 175, 10, 65, 50, "Barrier", LIGHT_WHITE)
+    weight_button = Button(LIGHT_BROWN, 245, 10, 75, 50, "Weight 2", BROWN)
+    start_algo_button = Button(GREEN, 325, 10, 115, 50, "Start Algorithm", LIGHT_GREEN)
+    pause_button = Button(YELLOW, 445, 10, 65, 50, "Pause", LIGHT_WHITE)
+    reset_button = Button(WHITE, 515, 10, 55, 50, "Reset", LIGHT_WHITE)
+    maze_button = Button(LIGHT_RED, 885, 10, 105, 50, "Random Maze", RED)
+    weight = WEIGHTS[0]
+    maze_kind = "Random"
 
     # Create dropdown menu for algorithm selection
-    algorithms = ["A* Search", "Dijkstra", "BFS", "DFS", "Bidirectional Search"]
-    algorithm_dropdown = Dropdown(610, 10, 180, 50, algorithms)
+    algorithms = [
+        "A* Search",
+        "Dijkstra",
+        "BFS",
+        "DFS",
+        "Bidirectional Search",
+        "Bidirectional A*",
+        "Jump Point Search",
+        "D* Lite",
+        "HPA*",
+    ]
+    algorithm_dropdown = Dropdown(575, 10, 150, 50, algorithms)
+
+    # 4-way, 8-way (diagonal steps) or any-angle (Theta*) movement
+    movement_dropdown = Dropdown(730, 10, 85, 50, MOVEMENTS)
+
+    # Search steps per frame; the scheduler runs searches between frames
+    speed_dropdown = Dropdown(820, 10, 60, 50, list(SPEEDS), default_index=1)
+    scheduler = Scheduler()
+
+    # Counters and phase timings, shown in the bottom strip of the button bar
+    stats = Stats()
+    stats.enabled = options.stats or options.trace is not None
+    overlay = Overlay(10, 62, 980, 16)
+    # Whether the scheduler is running a search rather than a replay; only
+    # searches have counters to write to --trace
+    searching = False
+
+    # Every run is recorded; R replays the last one (or O one from disk) with
+    # a timeline along the bottom of the window to scrub through it
+    recording = None
+    replay = None
+    timeline = Timeline(10, HEIGHT - 26, 980, 20)
+
+    # C races the --race algorithms in worker processes, one panel each; C,
+    # Escape or Reset ends the race
+    race = None
+
+    # Dropdowns go last so their open lists are drawn over the grid
+    widgets = [
+        start_button,
+        end_button,
+        barrier_button,
+        weight_button,
+        start_algo_button,
+        pause_button,
+        reset_button,
+        maze_button,
+        overlay,
+        algorithm_dropdown,
+        movement_dropdown,
+        speed_dropdown,
+    ]
+    renderer = Renderer(win, grid_obj)
+    renderer.stats = stats
+    # Mouse wheel zooms, right or middle drag pans, the minimap recentres
+    viewport = renderer.viewport
 
     # Variable to track the current mode (start, end, barrier)
     mode = None
@@ -173,7 +208,9 @@ def main(win, width):
                 start_button,
                 end_button,
                 barrier_button,
+                weight_button,
                 start_algo_button,
+                pause_button,
                 reset_button,
                 maze_button,
             ]:
@@ -193,12 +230,117 @@ def main(win, width):
             start_button.handle_event(event)
             end_button.handle_event(event)
             barrier_button.handle_event(event)
+            weight_button.handle_event(event)
             start_algo_button.handle_event(event)
+            pause_button.handle_event(event)
             reset_button.handle_event(event)
             algorithm_dropdown.handle_event(event)
+            movement_dropdown.handle_event(event)
+            speed_dropdown.handle_event(event)
             maze_button.handle_event(event)
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if race is not None:
+                # Only ending the race does anything while it is on
+                if (
+                    event.type == pygame.KEYDOWN
+                    and event.key in (pygame.K_c, pygame.K_ESCAPE)
+                ) or (
+                    event.type == pygame.MOUSEBUTTONDOWN and reset_button.is_over(pos)
+                ):
+                    race.close()
+                    for lane in race.lanes:
+                        widgets.remove(lane)
+                    race = None
+                    renderer.set_grid(grid_obj)
+                continue
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    scheduler.toggle_pause()
+                elif event.key == pygame.K_RIGHT:
+                    scheduler.step()
+                elif event.key == pygame.K_ESCAPE:
+                    scheduler.cancel()
+                elif event.key == pygame.K_HOME:
+                    viewport.fit()
+                elif event.key == pygame.K_i:
+                    stats.enabled = not stats.enabled
+                elif event.key == pygame.K_s:
+                    MapFile.save(
+                        options.map,
+                        grid_obj,
+                        hierarchy=hierarchy_for(grid_obj, create=False),
+                    )
+                    print("Saved " + options.map)
+                elif event.key == pygame.K_c and start is not None and end is not None:
+                    scheduler.cancel()
+                    replay = None
+                    race = Race(
+                        grid_obj,
+                        options.race,
+                        start,
+                        end,
+                        movement_dropdown.selected_option,
+                    )
+                    renderer.set_grids(
+                        [lane.grid for lane in race.lanes],
+                        race.layout(renderer.grid_area),
+                    )
+                    # Counter lines go under the dropdowns, like the timeline
+                    at = widgets.index(overlay) + 1
+                    widgets[at:at] = race.lanes
+                elif event.key == pygame.K_w and recording is not None:
+                    Recording.save(options.recording, recording)
+                    print("Saved " + options.recording)
+                elif event.key in (pygame.K_r, pygame.K_o):
+                    if event.key == pygame.K_o:
+                        try:
+                            recording = Recording.load(options.recording)
+                        except (OSError, ValueError) as error:
+                            print(
+                                "Could not load {}: {}".format(
+                                    options.recording, error
+                                )
+                            )
+                            continue
+                    if recording is not None:
+                        scheduler.cancel()
+                        replay = Recording.Replay(recording)
+                        grid_obj = replay.grid
+                        renderer.set_grid(grid_obj)
+                        start, end = find_ends(grid_obj)
+                        if timeline not in widgets:
+                            # Under the dropdowns, whose lists open over it
+                            widgets.insert(widgets.index(overlay) + 1, timeline)
+                        mode = None
+                        algorithm_ran = True
+                        scheduler.start(replay.steps())
+                        searching = False
+                elif event.key == pygame.K_l:
+                    try:
+                        stored = MapFile.load(options.map)
+                    except (OSError, ValueError) as error:
+                        print("Could not load {}: {}".format(options.map, error))
+                    else:
+                        scheduler.cancel()
+                        replay = None
+                        grid_obj = stored.grid
+                        renderer.set_grid(grid_obj)
+                        hierarchy = stored.hierarchy()
+                        if hierarchy is not None:
+                            use_hierarchy(hierarchy)
+                        start, end = find_ends(grid_obj)
+                        mode = None
+                        algorithm_ran = False
+
+            if event.type == pygame.MOUSEWHEEL:
+                if viewport.rect.collidepoint(pos):
+                    viewport.zoom(event.y, pos)
+            elif event.type == pygame.MOUSEMOTION:
+                if event.buttons[1] or event.buttons[2]:
+                    viewport.pan(*event.rel)
+
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if start_button.is_over(pos):
                     start_button.pressed = True
                     mode = "start"
@@ -208,124 +350,150 @@ def main(win, width):
                 elif barrier_button.is_over(pos):
                     barrier_button.pressed = True
                     mode = "barrier"
+                elif weight_button.is_over(pos):
+                    weight_button.pressed = True
+                    if mode == "weight":
+                        # Clicking again moves on to the next weight
+                        weight = WEIGHTS[(WEIGHTS.index(weight) + 1) % len(WEIGHTS)]
+                        weight_button.text = "Weight {}".format(weight)
+                    mode = "weight"
                 elif maze_button.is_over(pos) and not algorithm_ran:
                     maze_button.pressed = True
+                    if mode == "maze":
+                        # Clicking again moves on to the next generator
+                        kinds = list(Maze.GENERATORS)
+                        maze_kind = kinds[(kinds.index(maze_kind) + 1) % len(kinds)]
+                        maze_button.text = maze_kind + " Maze"
                     mode = "maze"
-                    generate_random_maze(grid)
+                    Maze.generate(grid_obj, maze_kind)
+                elif pause_button.is_over(pos):
+                    pause_button.pressed = True
+                    scheduler.toggle_pause()
                 elif reset_button.is_over(pos):
                     reset_button.pressed = True
+                    scheduler.cancel()
+                    replay = None
                     start = None
                     end = None
-                    grid_obj = Grid(ROWS, width)
-                    grid = grid_obj.grid
+                    grid_obj = Grid(ROWS)
+                    renderer.set_grid(grid_obj)
                     mode = None
                     algorithm_ran = False
                 elif start_algo_button.is_over(pos):
                     start_algo_button.pressed = True
                     mode = "start_algo"
-                if mode == "start_algo":
-                    if start and end and not algorithm_ran:
-                        # Start the algorithm
-                        for row in grid:
-                            for n in row:
-                                n.update_neighbors(grid)
-
-                        # Select the algorithm based on the dropdown selection
-                        if algorithm_dropdown.selected_option == "A* Search":
-                            algorithm = aStar
-                        elif algorithm_dropdown.selected_option == "Dijkstra":
-                            algorithm = dijkstra
-                        elif algorithm_dropdown.selected_option == "BFS":
-                            algorithm = bfs
-                        elif algorithm_dropdown.selected_option == "DFS":
-                            algorithm = dfs
-                        elif (
-                            algorithm_dropdown.selected_option == "Bidirectional Search"
-                        ):
-                            algorithm = bidirectional_search
-                        else:
-                            algorithm = (
-                                aStar  # Default to A* if no valid option is selected
-                            )
-
-                        algorithm(
-                            lambda: draw(
-                                win,
-                                grid,
-                                grid_obj,
-                                ROWS,
-                                width,
-                                start_button,
-                                end_button,
-                                barrier_button,
-                                start_algo_button,
-                                reset_button,
-                                maze_button,
-                                algorithm_dropdown,
-                                mouse_pos,
-                                mode,
-                            ),
-                            grid,
+                if mode == "start_algo" and start_algo_button.is_over(pos):
+                    if start is not None and end is not None:
+                        if algorithm_ran:
+                            # Re-run on the edited grid without the old colouring
+                            grid_obj.clear_search()
+
+                        replay = None
+                        recording = Recording.Recording(grid_obj)
+                        label = algorithm_dropdown.selected_option
+                        stats.begin_run(label)
+                        steps = search_steps(
+                            label,
+                            grid_obj,
                             start,
                             end,
+                            stats if stats.enabled else None,
+                            movement_dropdown.selected_option,
+                            recording,
                         )
+                        if options.profile:
+                            # One whole run inside the profiler, no animation
+                            name = "".join(c for c in label if c.isalnum())
+                            extension = (
+                                ".prof" if options.profile == "cprofile" else ".html"
+                            )
+                            profile_call(
+                                lambda: deque(steps, maxlen=1)[0],
+                                options.profile,
+                                "profile-" + name + extension,
+                            )
+                        else:
+                            # Run the dropdown's algorithm a few steps per frame
+                            scheduler.start(steps)
+                            searching = True
                         algorithm_ran = True
 
-        # Check for grid interactions outside of the event loop
-        if pygame.mouse.get_pressed()[0]:  # Left Mouse Button
-            row, col = get_clicked_pos(pos, ROWS, width)
-            if pos[1] > BUTTON_AREA_HEIGHT:
-                node = grid[row][col]
+        # Check for grid interactions outside of the event loop, but leave the
+        # grid alone while a search is reading it
+        target = viewport.minimap_at(mouse_pos)
+        on_timeline = replay is not None and timeline.is_over(mouse_pos)
+        if pygame.mouse.get_pressed()[0] and on_timeline:
+            # Seek, then carry on playing (or stay paused) from there
+            paused = scheduler.paused
+            replay.seek(timeline.step_at(mouse_pos))
+            scheduler.start(replay.steps())
+            searching = False
+            if paused:
+                scheduler.toggle_pause()
+        elif pygame.mouse.get_pressed()[0] and target is not None:
+            viewport.center_on(*target)
+        elif pygame.mouse.get_pressed()[0] and not scheduler.running and race is None:
+            cell = viewport.cell_at(mouse_pos)
+            if cell is not None:
                 # Place nodes based on the mode
-                if mode == "start" and not start and node != end:
-                    start = node
-                    start.make_start()
-                elif mode == "end" and not end and node != start:
-                    end = node
-                    end.make_end()
-                elif mode == "barrier" and node != end and node != start:
-                    node.make_barrier()
-
-        if any(
-            [
-                btn.state_changed
-                for btn in [
-                    start_button,
-                    end_button,
-                    barrier_button,
-                    start_algo_button,
-                    reset_button,
-                    maze_button,
-                ]
-            ]
-        ):
-            draw(
-                win,
-                grid,
-                grid_obj,
-                ROWS,
-                width,
-                start_button,
-                end_button,
-                barrier_button,
-                start_algo_button,
-                reset_button,
-                maze_button,
-                algorithm_dropdown,
-                mouse_pos,
-                mode,
-            )
-            for btn in [
-                start_button,
-                end_button,
-                barrier_button,
-                start_algo_button,
-                reset_button,
-                maze_button,
-            ]:
-                btn.state_changed = False
-
+                if mode == "start" and start is None and cell != end:
+                    start = cell
+                    grid_obj.set_state(start, START)
+                elif mode == "end" and end is None and cell != start:
+                    end = cell
+                    grid_obj.set_state(end, END)
+                elif mode == "barrier" and cell != end and cell != start:
+                    grid_obj.set_state(cell, BARRIER)
+                elif mode == "weight":
+                    grid_obj.set_cost(cell, weight)
+
+        scheduler.set_speed(speed_dropdown.selected_option)
+        was_running = scheduler.running
+        with stats.timed("search"):
+            scheduler.update()
+            if race is not None:
+                race.update(scheduler.search_budget)
+        if was_running and not scheduler.running:
+            if searching and options.trace:
+                name = "".join(c for c in stats.label if c.isalnum())
+                stats.export(
+                    os.path.join(
+                        options.trace,
+                        time.strftime("%Y%m%d-%H%M%S-") + name + ".json",
+                    )
+                )
+            searching = False
+        pause_button.text = "Resume" if scheduler.paused else "Pause"
+        overlay.update(stats)
+        if replay is not None:
+            timeline.update(replay)
+        elif timeline in widgets:
+            widgets.remove(timeline)
+            renderer.full_repaint = True
+
+        with stats.timed("render"):
+            draw(renderer, widgets, mouse_pos, mode)
+        for btn in [
+            start_button,
+            end_button,
+            barrier_button,
+            weight_button,
+            start_algo_button,
+            pause_button,
+            reset_button,
+            maze_button,
+        ]:
+            btn.state_changed = False
+
+        stats.frame(scheduler.tick(), scheduler.fps)
+
+    if race is not None:
+        race.close()
     pygame.quit()
 
 
-main(WIN, WIDTH)
+# Guarded so race and batch worker processes can import this module
+if __name__ == "__main__":
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Path Finding Algorithm Visualizer")
+    main(WIN, parse_args())
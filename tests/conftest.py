@@ -0,0 +1,33 @@
+import os
+import random
+import sys
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Grid import Grid, EMPTY, generate_random_maze  # noqa: E402
+
+
+def random_grid(size, density, seed, weights=False):
+    """
+    Seeded size x size grid with random barriers and opposite corners open;
+    with `weights`, about a third of the open cells get a cost from 2 to 9.
+    """
+    random.seed(seed)
+    grid = Grid(size)
+    generate_random_maze(grid, density)
+    grid.set_state(0, EMPTY)
+    grid.set_state(grid.size - 1, EMPTY)
+    if weights:
+        rng = random.Random(seed)
+        for cell in range(grid.size):
+            if not grid.is_barrier(cell) and rng.random() < 0.3:
+                grid.set_cost(cell, rng.randint(2, 9))
+    return grid
+
+
+def free_pairs(grid, count, seed):
+    rng = random.Random(seed)
+    free = [cell for cell in range(grid.size) if not grid.is_barrier(cell)]
+    return [tuple(rng.sample(free, 2)) for _ in range(count)]
+
@@ -0,0 +1,13 @@
+import Search
+from Batch import run_batch
+
+from conftest import free_pairs, random_grid
+
+
+def test_weighted_batch_matches_serial_astar():
+    grid = random_grid(30, 0.2, 4, weights=True)
+    queries = free_pairs(grid, 30, 4)
+    results = list(run_batch(grid, queries, processes=2, chunksize=4))
+    assert [(start, end) for start, end, _ in results] == queries
+    for start, end, result in results:
+        assert result.cost == Search.aStar(grid, start, end).cost
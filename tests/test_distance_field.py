@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import Search  # noqa: E402
+from DistanceField import UNREACHABLE, distance_field, path_from_field  # noqa: E402
+
+from conftest import free_pairs, random_grid  # noqa: E402
+
+GRIDS = [(24, density, seed) for density in (0.1, 0.25, 0.35) for seed in (1, 2)]
+
+
+@pytest.mark.parametrize("size, density, seed", GRIDS)
+def test_field_paths_are_as_short_as_bfs(size, density, seed):
+    grid = random_grid(size, density, seed)
+    found = 0
+    for source, target in free_pairs(grid, 15, seed):
+        field = distance_field(grid, source)
+        path = path_from_field(grid, field, target)
+        shortest = Search.bfs(grid, source, target)
+        assert bool(path) == shortest.found
+        if shortest.found:
+            found += 1
+            assert field[divmod(target, grid.cols)] == shortest.cost
+            assert len(path) - 1 == shortest.cost
+            assert path[0] == source and path[-1] == target
+            for a, b in zip(path, path[1:]):
+                assert b in grid.neighbors(a)
+        else:
+            assert field[divmod(target, grid.cols)] == UNREACHABLE
+    assert found > 0
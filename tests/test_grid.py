@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from Grid import Grid, BARRIER, CLOSED, EMPTY, END, OPEN, PATH, START
+
+
+def test_clear_search_keeps_the_edit_log():
+    # Clearing a run's colouring touches no barrier or cost, so incremental
+    # consumers keep their place; only the renderer is told to repaint
+    grid = Grid(4)
+    for cell, state in enumerate([START, END, BARRIER, OPEN, CLOSED, PATH]):
+        grid.set_state(cell, state)
+    grid.set_cost(7, 5)
+    version, repaints = grid.version, grid.repaints
+    grid.clear_search()
+    assert list(grid.state[:8]) == [START, END, BARRIER] + [EMPTY] * 5
+    assert grid.edits_since(version) == []
+    assert grid.repaints == repaints + 1
+
+
+@pytest.mark.parametrize("rows, cols", [(1, 1), (1, 9), (9, 1), (17, 23)])
+def test_kept_adjacency_matches_a_fresh_build(rows, cols):
+    # set_state keeps the neighbor bitmasks up to date as barriers come and go
+    grid = Grid(rows, cols)
+    grid.build_adjacency()
+    rng = random.Random(rows * cols)
+    for _ in range(500):
+        cell = rng.randrange(grid.size)
+        grid.set_state(cell, rng.choice([EMPTY, BARRIER, BARRIER, START, OPEN]))
+        fresh = Grid(rows, cols, state=bytearray(grid.state))
+        assert grid.adjacency == fresh.build_adjacency()
+
+    # And the masks say what the neighbors are
+    for cell in range(grid.size):
+        row, col = divmod(cell, cols)
+        expected = [
+            other
+            for other, inside in (
+                (cell + cols, row < rows - 1),
+                (cell - cols, row > 0),
+                (cell + 1, col < cols - 1),
+                (cell - 1, col > 0),
+            )
+            if inside and not grid.is_barrier(other)
+        ]
+        assert grid.neighbors(cell) == expected
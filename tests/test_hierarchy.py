@@ -0,0 +1,78 @@
+import random
+from collections import deque
+
+import pytest
+
+import Hierarchy as hierarchy_module
+import Search
+from Grid import BARRIER, EMPTY
+from Hierarchy import Hierarchy, hpa_star
+
+from conftest import free_pairs, random_grid
+
+
+def plan(hierarchy, start, end):
+    return deque(hierarchy.search_steps(start, end), maxlen=1)[0]
+
+
+@pytest.mark.parametrize("weights", [False, True])
+def test_kept_clusters_match_a_fresh_hierarchy(weights):
+    # Edits drop only the clusters they touch; what is left must answer as a
+    # hierarchy built from scratch would, near-optimally
+    grid = random_grid(40, 0.2, 2, weights=weights)
+    hierarchy = Hierarchy(grid, cluster_size=8)
+    rng = random.Random(2)
+    found = 0
+    for _ in range(20):
+        for _ in range(rng.randint(1, 8)):
+            cell = rng.randrange(grid.size)
+            if rng.random() < 0.7:
+                grid.set_state(cell, EMPTY if grid.is_barrier(cell) else BARRIER)
+            elif weights and not grid.is_barrier(cell):
+                grid.set_cost(cell, rng.randint(1, 9))
+        free = [cell for cell in range(grid.size) if not grid.is_barrier(cell)]
+        start, end = rng.sample(free, 2)
+        result = plan(hierarchy, start, end)
+        fresh = plan(Hierarchy(grid, cluster_size=8), start, end)
+        optimal = Search.aStar(grid, start, end)
+        assert result.found == fresh.found == optimal.found
+        if optimal.found:
+            found += 1
+            assert result.cost == fresh.cost >= optimal.cost
+            assert result.path[0] == start and result.path[-1] == end
+            for a, b in zip(result.path, result.path[1:]):
+                assert b in grid.neighbors(a)
+    assert found > 10
+
+
+def test_hpa_star_keeps_its_clusters_between_queries():
+    grid = random_grid(40, 0.2, 3)
+    pairs = free_pairs(grid, 10, 3)
+    hpa_star(grid, *pairs[0])
+    kept = hierarchy_module._kept
+    assert kept.edges
+    for start, end in pairs:
+        fresh = plan(Hierarchy(grid), start, end)
+        assert hpa_star(grid, start, end).cost == fresh.cost
+    assert hierarchy_module._kept is kept
+    # Another grid gets clusters of its own
+    hpa_star(random_grid(40, 0.2, 4), 0, 40 * 40 - 1)
+    assert hierarchy_module._kept is not kept
+
+
+def test_a_counting_wrapper_finds_the_kept_hierarchy():
+    # With stats on, the UI searches a CountingGraph over the grid; it must
+    # reuse clusters kept (or loaded) for the grid itself, and count them
+    pytest.importorskip("pygame")
+    import Algorithms
+    from Instrumentation import Stats
+
+    grid = random_grid(20, 0.2, 1)
+    loaded = Hierarchy(grid)
+    Algorithms.use_hierarchy(loaded)
+    stats = Stats()
+    counting, _ = stats.instrument(grid, Search.SearchObserver())
+    assert Algorithms.hierarchy_for(counting, create=False) is loaded
+    deque(Algorithms.search_steps("HPA*", grid, 0, grid.size - 1, stats), maxlen=0)
+    assert stats.counters["neighbor calls"] > 0
+    assert Algorithms.hierarchy_for(grid, create=False) is loaded
@@ -0,0 +1,97 @@
+import struct
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import MapFile  # noqa: E402
+from DistanceField import distance_field  # noqa: E402
+from Grid import BARRIER, CLOSED, END, EMPTY, START  # noqa: E402
+from Hierarchy import Hierarchy  # noqa: E402
+
+from conftest import random_grid  # noqa: E402
+
+
+@pytest.fixture
+def saved(tmp_path):
+    # A weighted 40x40 map with start, end, some search colouring, two
+    # distance fields and the HPA* clusters a query worked out
+    grid = random_grid(40, 0.2, 6, weights=True)
+    grid.set_state(0, START)
+    grid.set_state(grid.size - 1, END)
+    grid.set_state(41, CLOSED)
+    fields = {0: distance_field(grid, 0), 820: distance_field(grid, 820)}
+    hierarchy = Hierarchy(grid, cluster_size=8)
+    deque(hierarchy.search_steps(0, grid.size - 1), maxlen=1)
+    path = str(tmp_path / "grid.map")
+    MapFile.save(path, grid, fields, hierarchy)
+    return path, grid, fields, hierarchy
+
+
+def test_round_trip(saved):
+    path, grid, fields, hierarchy = saved
+    stored = MapFile.load(path)
+    loaded = stored.grid
+    assert (loaded.rows, loaded.cols) == (grid.rows, grid.cols)
+    # Search colouring is not saved
+    expected = bytearray(grid.state)
+    expected[41] = EMPTY
+    assert bytes(loaded.state) == bytes(expected)
+    assert bytes(loaded.costs) == bytes(grid.costs)
+    assert loaded.max_cost == grid.max_cost
+    assert bytes(loaded.adjacency) == bytes(grid.adjacency)
+    assert stored.fields.keys() == fields.keys()
+    for source, field in fields.items():
+        assert np.array_equal(stored.fields[source], field)
+    restored = stored.hierarchy()
+    assert restored.cluster_size == hierarchy.cluster_size
+    assert restored.transitions == hierarchy.transitions
+    assert restored.edges == hierarchy.edges
+
+
+def test_loaded_grid_stays_editable_without_touching_the_file(saved):
+    path, grid, _, _ = saved
+    with open(path, "rb") as f:
+        before = f.read()
+    loaded = MapFile.load(path).grid
+    loaded.set_state(1, BARRIER)
+    assert loaded.is_barrier(1)
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_read_only_maps_reject_edits(saved):
+    path = saved[0]
+    loaded = MapFile.load(path, writable=False).grid
+    with pytest.raises(TypeError):
+        loaded.set_state(1, BARRIER)
+
+
+def test_bad_magic_and_version(saved):
+    path = saved[0]
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    data[:6] = b"NOTMAP"
+    with open(path, "wb") as f:
+        f.write(data)
+    with pytest.raises(ValueError, match="not a map file"):
+        MapFile.load(path)
+
+    data[:6] = MapFile.MAGIC
+    struct.pack_into("<H", data, 6, MapFile.FORMAT_VERSION + 1)
+    with open(path, "wb") as f:
+        f.write(data)
+    with pytest.raises(ValueError, match="format version"):
+        MapFile.load(path)
+
+
+@pytest.mark.parametrize("length", [5, 40, 200, -1])
+def test_truncated_files(saved, length):
+    path = saved[0]
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:length])
+    with pytest.raises(ValueError):
+        MapFile.load(path)
@@ -0,0 +1,31 @@
+from collections import deque
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import Maze  # noqa: E402
+from Grid import Grid  # noqa: E402
+
+
+@pytest.mark.parametrize("rows, cols", [(3, 3), (21, 21), (40, 57), (101, 6)])
+def test_spanning_tree_is_a_perfect_maze(rows, cols):
+    # Every open cell is reachable and there are no loops: a tree has one
+    # passage fewer than it has cells
+    grid = Grid(rows, cols)
+    Maze.generate(grid, "Kruskal", seed=rows * cols)
+    open_cells = [cell for cell in range(grid.size) if not grid.is_barrier(cell)]
+    passages = sum(
+        1 for cell in open_cells for other in grid.neighbors(cell) if other > cell
+    )
+    assert passages == len(open_cells) - 1
+
+    first, _ = Maze.lattice_corners(grid)
+    seen = {first}
+    queue = deque([first])
+    while queue:
+        for other in grid.neighbors(queue.popleft()):
+            if other not in seen:
+                seen.add(other)
+                queue.append(other)
+    assert len(seen) == len(open_cells)
@@ -0,0 +1,57 @@
+import heapq
+import random
+
+import pytest
+
+from Queues import BinaryHeap, BucketQueue
+
+
+def check(queue, seed, fifo):
+    # Runs a search's workload (pushes never go below the last pop, a re-push
+    # only lowers a queued priority) against a plain heapq that skips
+    # superseded entries. Every pop must have the smallest live priority; with
+    # `fifo`, ties must also come out in push order.
+    rng = random.Random(seed)
+    heap = []
+    live = {}
+    last = pops = decreases = 0
+    for count in range(3000):
+        if live and (rng.random() < 0.4 or count >= 2000):
+            priority, item = queue.pop()
+            while live.get(heap[0][2]) != heap[0][0]:
+                heapq.heappop(heap)
+            assert priority == heap[0][0] == live.pop(item)
+            if fifo:
+                assert item == heapq.heappop(heap)[2]
+            last = priority
+            pops += 1
+        elif count < 2000:
+            item = rng.randrange(300)
+            priority = last + rng.randrange(12)
+            if live.get(item, priority + 1) <= priority:
+                continue
+            decreases += item in live
+            queue.push(item, priority)
+            live[item] = priority
+            heapq.heappush(heap, (priority, count, item))
+        assert len(queue) == len(live)
+        probe = rng.randrange(300)
+        assert (probe in queue) == (probe in live)
+    assert not live and pops > 500 and decreases > 50
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_binary_heap_pops_like_heapq(seed):
+    check(BinaryHeap(), seed, fifo=True)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_bucket_queue_pops_like_heapq(seed):
+    check(BucketQueue(), seed, fifo=False)
+    queue = BucketQueue()
+    queue.push(1, 5)
+    queue.pop()
+    with pytest.raises(ValueError):
+        queue.push(2, 4)
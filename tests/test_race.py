@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from Grid import END, PATH, START  # noqa: E402
+from Movement import graph_for  # noqa: E402
+from Race import Race  # noqa: E402
+from Strategies import search_for  # noqa: E402
+
+from conftest import random_grid  # noqa: E402
+
+LABELS = ["A* Search", "Dijkstra", "Jump Point Search", "HPA*"]
+
+
+@pytest.mark.parametrize("movement", ["4-way", "8-way"])
+def test_race_costs_match_direct_calls(movement):
+    grid = random_grid(30, 0.2, 4, weights=movement == "4-way")
+    start, end = 0, grid.size - 1
+    grid.set_state(start, START)
+    grid.set_state(end, END)
+    race = Race(grid, LABELS, start, end, movement)
+    try:
+        deadline = time.perf_counter() + 30
+        while any(lane.outcome is None for lane in race.lanes):
+            assert time.perf_counter() < deadline
+            race.update(0.01)
+        race.update(10)
+    finally:
+        race.close()
+
+    graph = graph_for(grid, movement)
+    for lane in race.lanes:
+        direct = search_for(lane.label, movement)(graph, start, end)
+        assert direct.found
+        assert lane.outcome == "cost {:g}".format(direct.cost)
+        # The whole log was played into the lane's grid
+        painted = {cell for cell in range(grid.size) if lane.grid.state[cell] == PATH}
+        assert painted == set(direct.path) - {start, end}
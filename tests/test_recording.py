@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+import Recording
+import Search
+from Algorithms import PaintObserver
+from Grid import END, START
+
+from conftest import random_grid
+
+
+@pytest.fixture
+def run(monkeypatch):
+    # A recorded Dijkstra run with keyframes every few dozen events, and the
+    # live grid's state after every step
+    monkeypatch.setattr(Recording, "KEYFRAME_EVENTS", 40)
+    grid = random_grid(24, 0.25, 3, weights=True)
+    start, end = 0, grid.size - 1
+    grid.set_state(start, START)
+    grid.set_state(end, END)
+    recording = Recording.Recording(grid)
+    observer = PaintObserver(grid, start, end, recording)
+    states = [bytes(grid.state)]
+    for value in recording.record(Search.dijkstra.steps(grid, start, end, observer)):
+        if value is None:
+            states.append(bytes(grid.state))
+    assert len(recording.keyframes) > 3
+    return recording, states
+
+
+def test_replay_matches_the_live_run(run):
+    recording, states = run
+    replay = Recording.Replay(recording)
+    assert bytes(replay.grid.costs) == bytes(recording.grid.costs)
+    assert bytes(replay.grid.state) == states[0]
+    for step, state in enumerate(states[1:], 1):
+        assert replay.advance()
+        assert replay.step == step
+        assert bytes(replay.grid.state) == state
+    assert not replay.advance()
+
+
+def test_seek_matches_sequential_replay(run):
+    recording, states = run
+    replay = Recording.Replay(recording)
+    rng = random.Random(3)
+    for step in [len(states) - 1, 0] + rng.choices(range(len(states)), k=40):
+        replay.seek(step)
+        assert replay.step == step
+        assert bytes(replay.grid.state) == states[step]
+
+
+def test_save_and_load_round_trip(run, tmp_path):
+    recording, states = run
+    path = str(tmp_path / "run.rec")
+    Recording.save(path, recording)
+    loaded = Recording.load(path)
+    assert loaded.steps == recording.steps
+    assert loaded.keyframes == recording.keyframes
+    assert loaded.events == recording.events
+    replay = Recording.Replay(loaded)
+    for step in (len(states) // 2, len(states) - 1, 1):
+        replay.seek(step)
+        assert bytes(replay.grid.state) == states[step]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "grid.map"
+    path.write_bytes(b"not a recording at all, but long enough for a header")
+    with pytest.raises(ValueError):
+        Recording.load(str(path))
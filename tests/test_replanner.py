@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+import Search
+from Grid import BARRIER, EMPTY
+from Movement import graph_for
+from Replanner import DStarLite
+
+from conftest import random_grid
+
+
+@pytest.mark.parametrize("movement", ["4-way", "8-way"])
+@pytest.mark.parametrize("weights", [False, True])
+def test_replanning_matches_a_fresh_search(movement, weights):
+    # After every batch of barrier and cost edits the repaired plan costs
+    # what a search from scratch finds
+    grid = random_grid(20, 0.2, 4, weights=weights)
+    graph = graph_for(grid, movement)
+    start, end = 0, grid.size - 1
+    planner = DStarLite(graph, start, end)
+    rng = random.Random(4)
+    found = 0
+    for _ in range(25):
+        for _ in range(rng.randint(1, 6)):
+            cell = rng.randrange(1, grid.size - 1)
+            if rng.random() < 0.7:
+                grid.set_state(cell, EMPTY if grid.is_barrier(cell) else BARRIER)
+            elif weights and not grid.is_barrier(cell):
+                grid.set_cost(cell, rng.randint(1, 9))
+        result = planner.plan()
+        fresh = Search.aStar(graph, start, end)
+        assert result.found == fresh.found
+        if fresh.found:
+            found += 1
+            assert result.cost == pytest.approx(fresh.cost)
+            assert result.path[0] == start and result.path[-1] == end
+            for a, b in zip(result.path, result.path[1:]):
+                assert b in graph.neighbors(a)
+    assert found > 10
+
+
+@pytest.mark.parametrize("movement", ["4-way", "8-way"])
+def test_moving_the_start_matches_a_fresh_search(movement):
+    # An agent walks part of its path, a few cells change, and it replans from
+    # where it stands
+    grid = random_grid(20, 0.2, 4, weights=True)
+    graph = graph_for(grid, movement)
+    end = grid.size - 1
+    planner = DStarLite(graph, 0, end)
+    result = planner.plan()
+    rng = random.Random(4)
+    moves = 0
+    while result.found and len(result.path) > 1:
+        planner.move_start(result.path[min(3, len(result.path) - 1)])
+        for _ in range(3):
+            cell = rng.randrange(grid.size)
+            if cell not in (planner.start, end):
+                grid.set_state(cell, EMPTY if grid.is_barrier(cell) else BARRIER)
+        result = planner.plan()
+        fresh = Search.aStar(graph, planner.start, end)
+        assert result.found == fresh.found
+        if fresh.found:
+            assert result.cost == pytest.approx(fresh.cost)
+            assert result.path[0] == planner.start and result.path[-1] == end
+        moves += 1
+    assert moves > 5
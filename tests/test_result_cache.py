@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from Grid import BARRIER, EMPTY
+from Movement import MOVEMENTS, graph_for
+from ResultCache import ResultCache
+from Strategies import search_for
+
+from conftest import free_pairs, random_grid
+
+
+@pytest.mark.parametrize("movement", MOVEMENTS)
+def test_cached_results_stay_optimal_under_edits(movement):
+    # Whatever the cache still hands out after an edit must cost what a
+    # fresh search finds
+    grid = random_grid(16, 0.25, 7, weights=True)
+    graph = graph_for(grid, movement)
+    search = search_for("A* Search", movement)
+    queries = free_pairs(grid, 6, 7)
+    ends = {cell for query in queries for cell in query}
+    cache = ResultCache(grid)
+    rng = random.Random(7)
+    for _ in range(60):
+        cell = rng.randrange(grid.size)
+        if cell not in ends:
+            if rng.random() < 0.5:
+                grid.set_state(cell, EMPTY if grid.is_barrier(cell) else BARRIER)
+            elif not grid.is_barrier(cell):
+                grid.set_cost(cell, rng.randint(1, 9))
+        for start, end in queries:
+            cached = cache.search(graph, search, start, end)
+            fresh = search(graph, start, end)
+            assert cached.found == fresh.found
+            assert cached.cost == pytest.approx(fresh.cost)
+    assert cache.hits
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("pygame")
+
+from Scheduler import Scheduler  # noqa: E402
+
+
+def task(log, steps):
+    # Stands in for a search: `steps` plain steps, then its result
+    try:
+        for step in range(steps):
+            log.append(step)
+            yield
+        yield "result"
+    finally:
+        log.append("closed")
+
+
+def test_step_and_update_advance_by_the_speed():
+    scheduler = Scheduler()
+    log = []
+    scheduler.start(task(log, 50))
+    scheduler.step()
+    assert log == [0]
+    scheduler.set_speed("10x")
+    scheduler.update()
+    assert log == list(range(11))
+    scheduler.set_speed("100x")
+    scheduler.update()
+    assert log[-1] == "closed" and log[-2] == 49
+    assert scheduler.result == "result"
+    assert not scheduler.running
+
+
+def test_pause_holds_updates_but_not_single_steps():
+    scheduler = Scheduler()
+    scheduler.set_speed("10x")
+    log = []
+    scheduler.start(task(log, 50))
+    scheduler.toggle_pause()
+    scheduler.update()
+    assert log == []
+    scheduler.step()
+    scheduler.step()
+    assert log == [0, 1]
+    scheduler.toggle_pause()
+    scheduler.update()
+    assert log == list(range(12))
+
+
+def test_cancel_closes_the_task():
+    scheduler = Scheduler()
+    log = []
+    scheduler.start(task(log, 50))
+    scheduler.step()
+    scheduler.toggle_pause()
+    scheduler.cancel()
+    assert log == [0, "closed"]
+    assert not scheduler.running and not scheduler.paused
+    scheduler.update()
+    scheduler.step()
+    assert log == [0, "closed"]
+
+    # Starting a task cancels the one running
+    first, second = [], []
+    scheduler.start(task(first, 5))
+    scheduler.step()
+    scheduler.start(task(second, 5))
+    assert first == [0, "closed"]
+    scheduler.step()
+    assert second == [0]
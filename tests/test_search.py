@@ -0,0 +1,67 @@
+import pytest
+
+import Search
+from Movement import OctileGrid, euclidean, graph_for
+
+from conftest import free_pairs, random_grid
+
+# Random grids of a few densities, each with queries between its free cells
+GRIDS = [(24, density, seed) for density in (0.1, 0.25, 0.35) for seed in (1, 2)]
+
+
+@pytest.mark.parametrize("size, density, seed", GRIDS)
+def test_jump_point_search_is_optimal(size, density, seed):
+    grid = random_grid(size, density, seed)
+    for start, end in free_pairs(grid, 15, seed):
+        result = Search.jump_point_search(grid, start, end)
+        optimal = Search.dijkstra(grid, start, end)
+        assert result.found == optimal.found
+        assert result.cost == optimal.cost
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            for a, b in zip(result.path, result.path[1:]):
+                assert b in grid.neighbors(a)
+            assert Search.path_cost(grid, result.path) == optimal.cost
+
+
+@pytest.mark.parametrize("size, density, seed", GRIDS)
+def test_theta_star_beats_8_way_paths(size, density, seed):
+    # Any-angle paths are never longer than the best 8-way path, nor shorter
+    # than a straight line
+    grid = random_grid(size, density, seed)
+    graph = OctileGrid(grid)
+    for start, end in free_pairs(grid, 15, seed):
+        result = Search.theta_star(grid, start, end)
+        octile = Search.dijkstra(graph, start, end)
+        assert result.found == octile.found
+        if result.found:
+            assert result.cost <= octile.cost + 1e-9
+            assert result.cost >= euclidean(start, end, grid.cols) - 1e-9
+            assert result.path[0] == start and result.path[-1] == end
+            assert not any(grid.is_barrier(cell) for cell in result.path)
+
+
+def test_theta_star_on_terrain_is_optimal_8_way():
+    grid = random_grid(24, 0.2, 3, weights=True)
+    graph = OctileGrid(grid)
+    for start, end in free_pairs(grid, 15, 3):
+        result = Search.theta_star(grid, start, end)
+        assert result.cost == pytest.approx(Search.dijkstra(graph, start, end).cost)
+
+
+@pytest.mark.parametrize("movement", ["4-way", "8-way"])
+@pytest.mark.parametrize("weights", [False, True])
+@pytest.mark.parametrize("size, density, seed", GRIDS)
+def test_bidirectional_astar_is_optimal(size, density, seed, weights, movement):
+    grid = random_grid(size, density, seed, weights=weights)
+    graph = graph_for(grid, movement)
+    for start, end in free_pairs(grid, 15, seed):
+        result = Search.bidirectional_astar(graph, start, end)
+        optimal = Search.dijkstra(graph, start, end)
+        assert result.found == optimal.found
+        if result.found:
+            assert result.cost == pytest.approx(optimal.cost)
+            assert result.path[0] == start and result.path[-1] == end
+            for a, b in zip(result.path, result.path[1:]):
+                assert b in graph.neighbors(a)
+            assert Search.path_cost(graph, result.path) == pytest.approx(optimal.cost)
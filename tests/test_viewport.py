@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from Grid import Grid  # noqa: E402
+from Viewport import Viewport  # noqa: E402
+
+
+@pytest.mark.parametrize("rows, cols", [(7, 3), (50, 70), (900, 600)])
+def test_cell_at_inverts_cell_placement(rows, cols):
+    # Whatever the zoom and pan, a point hits the cell drawn under it
+    viewport = Viewport((10, 90, 400, 300))
+    viewport.set_grid(Grid(rows, cols))
+    view = viewport.rect
+    rng = random.Random(rows)
+    for _ in range(40):
+        if rng.random() < 0.5:
+            pos = (
+                rng.randrange(view.left, view.right),
+                rng.randrange(view.top, view.bottom),
+            )
+            viewport.zoom(rng.choice([-3, -1, 1, 2, 4]), pos)
+        else:
+            viewport.pan(rng.randint(-200, 200), rng.randint(-200, 200))
+
+        top, bottom, left, right = viewport.visible()
+        for _ in range(100):
+            row, col = rng.randrange(top, bottom), rng.randrange(left, right)
+            rect = viewport.cell_rect(row, col).clip(view)
+            if not rect:
+                continue  # Narrower than a pixel when zoomed out
+            for x in (rect.left, rect.right - 1):
+                for y in (rect.top, rect.bottom - 1):
+                    assert viewport.cell_at((x, y)) == row * cols + col
+
+        for _ in range(100):
+            pos = (
+                rng.randrange(view.left, view.right),
+                rng.randrange(view.top, view.bottom),
+            )
+            cell = viewport.cell_at(pos)
+            if cell is not None:
+                assert viewport.cell_rect(*divmod(cell, cols)).collidepoint(pos)
+        assert viewport.cell_at((view.left - 1, view.top)) is None
+        assert viewport.cell_at((view.left, view.bottom)) is None